@@ -1,9 +1,16 @@
-from fastapi import FastAPI, Header, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from typing import Optional
 import logging
-from fraud_engine.engine import process_audio_text
+from fraud_engine.codec import FAST_CODEC, JSON_MIMETYPE, decode_request, encode_response
+from fraud_engine.decoder import sniff_format
+from fraud_engine.engine import finalize_call, process_audio_text
+from fraud_engine.quota import KEY_POLICIES, QUEUE_TIMEOUT_SEC, TEXT_COST, estimate_audio_seconds, quota_manager, scheduler
+from fraud_engine.session import session_key
+from fraud_engine.transport import ASGITransport, audio_format_from_content_type
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,6 +22,10 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# gzip/zstd request bodies and compressed responses. Added first so CORS (the
+# last added, hence outermost middleware) also wraps its 400/413/415 errors.
+app.add_middleware(ASGITransport)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allow ALL origins (hackathon-friendly)
@@ -24,23 +35,33 @@ app.add_middleware(
 )
 
 class AnalyzeRequest(BaseModel):
-    language: str = Field(default="en", description="Language of the call (e.g., 'en', 'hi')")
+    language: str = Field(default="auto", description="Language of the call ('en', 'hi', 'ta', 'te' or 'auto' to detect)")
     audio_format: str = Field(default="wav", alias="audioFormat", description="Format of the audio (e.g., 'wav', 'mp3')")
     audio_base64: Optional[str] = Field(None, alias="audioBase64", description="Base64 encoded audio string")
     audio_url: Optional[str] = Field(None, alias="audioUrl", description="URL to download the audio file from")
     text_input: Optional[str] = Field(None, alias="textInput", description="Direct text input for analysis (no audio)")
+    call_id: Optional[str] = Field(None, alias="callId", description="Scores this input as the next segment of the call (see /analyze/finalize)")
 
     class Config:
         populate_by_name = True
 
-@app.post("/analyze")
-def analyze_call(
-    request: AnalyzeRequest,
-    x_api_key: Optional[str] = Header(None)
-):
-    # API Key Security for Hackathon - Support multiple keys
-    VALID_API_KEYS = ["fraud_detection_api_key_2026", "HACKATHON_DEMO_2026"]
-    
+class FinalizeRequest(BaseModel):
+    call_id: str = Field(..., alias="callId", description="Call to finish")
+
+    class Config:
+        populate_by_name = True
+
+# API Key Security for Hackathon - Support multiple keys
+VALID_API_KEYS = list(KEY_POLICIES)
+
+async def _run_analysis(x_api_key, language, audio_format, text_input=None, audio_base64=None,
+                        audio_url=None, audio_bytes=None, call_id=None, response_headers=None):
+    """
+    Quota, fair scheduling and analysis shared by the pydantic, fast-codec and binary routes.
+    Queued requests wait on the event loop and only take a threadpool thread once they
+    hold an analysis slot, so a flood of batch uploads cannot fill the threadpool ahead
+    of interactive requests and health checks.
+    """
     logger.info(f"Received request with API key: {x_api_key[:10]}..." if x_api_key else "No API key provided")
     
     if x_api_key not in VALID_API_KEYS:
@@ -48,31 +69,47 @@ def analyze_call(
         raise HTTPException(status_code=403, detail="Invalid API Key. Unauthorized access.")
 
     try:
-        logger.info(f"Processing request - Text input: {bool(request.text_input)}, Audio: {bool(request.audio_base64 or request.audio_url)}")
+        logger.info(f"Processing request - Text input: {bool(text_input)}, Audio: {bool(audio_base64 or audio_url or audio_bytes)}")
         
-        # Support both audio and text input
-        if request.text_input:
-            # Text-only analysis
-            analysis = process_audio_text(
-                text_input=request.text_input,
-                audio_format=request.audio_format
-            )
-        elif request.audio_base64 or request.audio_url:
-            # Audio analysis
-            analysis = process_audio_text(
-                audio_base64=request.audio_base64,
-                audio_url=request.audio_url,
-                audio_format=request.audio_format
-            )
-        else:
+        if not (text_input or audio_base64 or audio_url or audio_bytes):
             raise HTTPException(status_code=400, detail="Must provide either audio_base64, audio_url, or text_input")
 
+        # Per-key quotas; audio is reserved from its estimated length and settled after analysis
+        is_audio = not text_input
+        cost = estimate_audio_seconds(audio_base64, audio_url, audio_bytes) if is_audio else TEXT_COST
+        reserved = cost if is_audio else 0.0
+        allowed, rate_headers = quota_manager.check(x_api_key, audio_seconds=reserved)
+        if not allowed:
+            logger.warning("Quota exceeded")
+            raise HTTPException(status_code=429, detail="Rate limit exceeded. Retry later.", headers=rate_headers)
+        if response_headers is not None:
+            response_headers.update(rate_headers)
+
+        # Wait for a fair share of the analysis workers
+        measured = 0.0
+        try:
+            if not await scheduler.acquire_async(x_api_key, cost):
+                raise HTTPException(status_code=503, detail="Server busy. Retry later.", headers={"Retry-After": str(QUEUE_TIMEOUT_SEC)})
+            try:
+                analysis = await run_in_threadpool(
+                    _analyze, x_api_key, language, audio_format, text_input, audio_base64, audio_url, audio_bytes, call_id)
+            finally:
+                scheduler.release()
+            if is_audio:
+                # A call segment's acoustics cover the whole call; charge only this segment
+                measured = analysis.get("segment_duration_sec", analysis.get("acoustics", {}).get("duration_sec", 0))
+        finally:
+            # Failed and rejected requests get their reservation back
+            quota_manager.settle_audio(x_api_key, reserved, measured)
+
         logger.info(f"Analysis complete - Classification: {analysis.get('classification')}, Confidence: {analysis.get('confidence')}")
         
+        if call_id:
+            analysis["call_id"] = call_id
         return {
             "status": "success",
-            "language": request.language,
-            "audio_format": request.audio_format,
+            "language": language,
+            "audio_format": audio_format,
             **analysis
         }
     except HTTPException:
@@ -81,6 +118,118 @@ def analyze_call(
         logger.error(f"Analysis error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+def _analyze(x_api_key, language, audio_format, text_input, audio_base64, audio_url, audio_bytes, call_id):
+    """Runs the engine, on a threadpool thread, in the analysis slot taken by _run_analysis."""
+    # Support both audio and text input
+    if text_input:
+        # Text-only analysis
+        return process_audio_text(
+            text_input=text_input,
+            audio_format=audio_format,
+            language=language,
+            call_id=session_key(x_api_key, call_id) if call_id else None
+        )
+    # Audio analysis
+    return process_audio_text(
+        audio_base64=audio_base64,
+        audio_url=audio_url,
+        audio_format=audio_format,
+        language=language,
+        audio_bytes=audio_bytes,
+        call_id=session_key(x_api_key, call_id) if call_id else None
+    )
+
+async def analyze_call(
+    request: AnalyzeRequest,
+    response: Response,
+    x_api_key: Optional[str] = Header(None)
+):
+    return await _run_analysis(
+        x_api_key,
+        language=request.language,
+        audio_format=request.audio_format,
+        text_input=request.text_input,
+        audio_base64=request.audio_base64,
+        audio_url=request.audio_url,
+        call_id=request.call_id,
+        response_headers=response.headers
+    )
+
+async def analyze_call_fast(
+    request: Request,
+    x_api_key: Optional[str] = Header(None)
+):
+    # Reject unknown keys before reading a possibly large body
+    if x_api_key not in VALID_API_KEYS:
+        logger.warning(f"Invalid API key attempt: {x_api_key}")
+        raise HTTPException(status_code=403, detail="Invalid API Key. Unauthorized access.")
+
+    # Raw body parsed with msgspec; the base64 audio is decoded straight from the body bytes
+    try:
+        data = decode_request(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {}
+    result = await _run_analysis(
+        x_api_key,
+        language=data["language"],
+        audio_format=data["audioFormat"],
+        text_input=data["textInput"],
+        audio_url=data["audioUrl"],
+        audio_bytes=data["audioBytes"],
+        call_id=data["callId"],
+        response_headers=headers
+    )
+    return Response(content=encode_response(result), media_type=JSON_MIMETYPE, headers=headers)
+
+# FAST_CODEC=1 swaps pydantic validation and stdlib JSON for msgspec on the hot endpoint
+app.post("/analyze")(analyze_call_fast if FAST_CODEC else analyze_call)
+
+@app.post("/analyze/audio")
+async def analyze_audio_upload(
+    request: Request,
+    language: str = Query("auto", description="Language of the call ('en', 'hi', 'ta', 'te' or 'auto' to detect)"),
+    audio_format: Optional[str] = Query(None, alias="audioFormat", description="Defaults to the Content-Type (e.g. 'audio/ogg; codecs=opus'), then the sniffed container"),
+    call_id: Optional[str] = Query(None, alias="callId", description="Scores the upload as the next segment of the call"),
+    x_api_key: Optional[str] = Header(None)
+):
+    """Binary audio upload (Opus, FLAC, WAV, ...) without base64."""
+    if x_api_key not in VALID_API_KEYS:
+        logger.warning(f"Invalid API key attempt: {x_api_key}")
+        raise HTTPException(status_code=403, detail="Invalid API Key. Unauthorized access.")
+
+    audio_bytes = await request.body()
+    headers = {}
+    result = await _run_analysis(
+        x_api_key,
+        language=language,
+        audio_format=audio_format or audio_format_from_content_type(request.headers.get("content-type")) or sniff_format(audio_bytes) or "wav",
+        audio_bytes=audio_bytes,
+        call_id=call_id,
+        response_headers=headers
+    )
+    if FAST_CODEC:
+        return Response(content=encode_response(result), media_type=JSON_MIMETYPE, headers=headers)
+    return JSONResponse(result, headers=headers)
+
+@app.post("/analyze/finalize")
+def finalize(
+    request: FinalizeRequest,
+    x_api_key: Optional[str] = Header(None)
+):
+    """Ends a segmented call (see callId on /analyze) and returns its overall verdict."""
+    if x_api_key not in VALID_API_KEYS:
+        logger.warning(f"Invalid API key attempt: {x_api_key}")
+        raise HTTPException(status_code=403, detail="Invalid API Key. Unauthorized access.")
+
+    analysis = finalize_call(session_key(x_api_key, request.call_id))
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired callId")
+
+    logger.info(f"Call finalized - Classification: {analysis.get('classification')}, Segments: {analysis.get('segments')}")
+    return {"status": "success", "call_id": request.call_id, **analysis}
+
 @app.get("/")
 def health():
     return {"status": "ok", "message": "Fraud Call Analyzer API is running"}
@@ -0,0 +1,92 @@
+"""
+Request parsing + base64 decoding: stdlib json/pydantic vs the msgspec fast codec.
+
+Usage (from fraud_call_analyzer_adv/):
+    python -m benchmarks.bench_codec --save-baseline
+    python -m benchmarks.bench_codec --filter 50MB
+
+Each case turns a raw /analyze body into decoded audio bytes, which is all the
+servers do before handing off to the engine. Peak memory is the main figure
+for large payloads: the stdlib path holds the body, the decoded str, a copy
+without the data-URL prefix and the audio at the same time.
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+
+from benchmarks import harness
+from benchmarks.samples import synthetic_wav
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline_codec.json")
+
+PAYLOAD_SIZES = {"1MB": 1, "10MB": 10, "50MB": 50}
+RATE = 16000
+OPTIONS = {
+    "1MB": {"min_iterations": 20, "min_time": 1.0},
+    "10MB": {"min_iterations": 5, "min_time": 1.0},
+    "50MB": {"min_iterations": 3, "min_time": 0.0},
+}
+
+SAMPLE_RESPONSE = {
+    "status": "success", "language": "auto", "detected_language": "en", "audio_format": "wav",
+    "classification": "MEDIUM", "confidence": 0.6, "matched_keywords": ["otp", "bank"],
+    "reason": "Detected MEDIUM Risk Keywords: otp, bank",
+    "transcript": "sir your bank account will be blocked share the otp",
+    "acoustics": {"avg_db": -24.8, "silence_ratio": 0.21, "duration_sec": 42.5}
+}
+
+
+def make_body(megabytes: int, data_url: bool = True) -> bytes:
+    """An /analyze JSON body of roughly `megabytes` MB carrying a WAV recording."""
+    seconds = megabytes * 1024 * 1024 * 3 / 4 / (RATE * 2)
+    audio = base64.b64encode(synthetic_wav(seconds, RATE)).decode()
+    if data_url:
+        audio = "data:audio/wav;base64," + audio
+    return json.dumps({"language": "en", "audioFormat": "wav", "audioBase64": audio}).encode()
+
+
+def stdlib_parse(body: bytes, model) -> bytes:
+    """What the servers did before: json/pydantic, then split + b64decode of the str."""
+    request = model(**json.loads(body))
+    audio_base64 = request.audio_base64
+    if "," in audio_base64:
+        audio_base64 = audio_base64.split(",", 1)[1]
+    return base64.b64decode(audio_base64)
+
+
+def build_cases():
+    from app import AnalyzeRequest
+    from fraud_engine import codec
+
+    if codec.msgspec is None:
+        print("msgspec not installed: fast codec cases skipped")
+
+    cases = []
+    for label, megabytes in PAYLOAD_SIZES.items():
+        options = OPTIONS[label]
+        body = make_body(megabytes)
+        cases.append((f"request[{label}] json+pydantic",
+                      lambda body=body: stdlib_parse(body, AnalyzeRequest), options))
+        if codec.msgspec is not None:
+            cases.append((f"request[{label}] msgspec", lambda body=body: codec.decode_request(body), options))
+
+    small = {"min_iterations": 1000, "min_time": 1.0, "max_iterations": 100000}
+    cases.append(("response json.dumps", lambda: json.dumps(SAMPLE_RESPONSE).encode(), small))
+    if codec.msgspec is not None:
+        cases.append(("response msgspec", lambda: codec.encode_response(SAMPLE_RESPONSE), small))
+    return cases
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Request codec benchmarks: stdlib json/pydantic vs msgspec")
+    harness.add_common_arguments(parser, DEFAULT_BASELINE)
+    args = parser.parse_args()
+
+    results = harness.run_cases(build_cases(), args.name_filter)
+    return harness.finish(args, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Spawn-per-request decoding vs the native WAV path and the pooled decoder.
+
+Usage (from fraud_call_analyzer_adv/):
+    python -m benchmarks.bench_decoder --save-baseline
+    python -m benchmarks.bench_decoder --concurrency 8 --batch 32
+
+Compressed inputs are produced with the ffmpeg binary, which is also the
+spawn-per-request baseline. The pydub cases additionally need ffprobe.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import harness
+from benchmarks.samples import synthetic_wav
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline_decoder.json")
+
+DURATIONS = {"5s": 5, "60s": 60}
+RATE = 16000
+COMPRESSED_FORMATS = {
+    "opus": ["-c:a", "libopus", "-b:a", "24k", "-f", "ogg"],
+    "flac": ["-f", "flac"],
+    "mp3": ["-f", "mp3"],
+    "ogg": ["-c:a", "libvorbis", "-f", "ogg"],
+    # moov atom first, so the file can be decoded from a pipe
+    "m4a": ["-c:a", "aac", "-movflags", "+faststart", "-f", "ipod"]
+}
+OPTIONS = {"5s": {"min_iterations": 10, "min_time": 1.0}, "60s": {"min_iterations": 3, "min_time": 1.0}}
+
+
+def encode(wav: bytes, audio_format: str) -> bytes:
+    # Written to a file because the mp4 muxer needs a seekable output
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, f"sample.{audio_format}")
+        command = ["ffmpeg", "-loglevel", "error", "-i", "pipe:0"] + COMPRESSED_FORMATS[audio_format] + [path]
+        subprocess.run(command, input=wav, check=True)
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def spawn_decode(data: bytes) -> bytes:
+    """One ffmpeg process per request, PCM over a pipe: the lower bound of pydub's cost."""
+    command = ["ffmpeg", "-loglevel", "error", "-i", "pipe:0", "-f", "s16le", "-acodec", "pcm_s16le", "pipe:1"]
+    return subprocess.run(command, input=data, stdout=subprocess.PIPE, check=True).stdout
+
+
+def pydub_decode(data: bytes, suffix: str):
+    """What audio_processor did before: temp file + AudioSegment.from_file (ffprobe + ffmpeg)."""
+    from pydub import AudioSegment
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as f:
+        f.write(data)
+    try:
+        return AudioSegment.from_file(f.name)
+    finally:
+        os.remove(f.name)
+
+
+def batch(func, payload, size: int, concurrency: int):
+    """Decodes `size` copies of the payload from `concurrency` request threads."""
+    def run():
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(lambda _: func(payload), range(size)))
+    return run
+
+
+def build_cases(args):
+    from fraud_engine import decoder
+    decode_audio = decoder.decode_audio
+
+    have_ffmpeg = shutil.which("ffmpeg") is not None
+    have_ffprobe = shutil.which("ffprobe") is not None
+    if not have_ffmpeg:
+        print("ffmpeg not found: compressed-format cases skipped")
+    elif not have_ffprobe:
+        print("ffprobe not found: pydub compressed-format cases skipped")
+
+    batch_options = {"min_iterations": 2, "min_time": 0.0, "warmup": 1}
+    cases = []
+    for label, seconds in DURATIONS.items():
+        options = OPTIONS[label]
+        wav = synthetic_wav(seconds, RATE)
+        cases.append((f"wav[{label}] pydub.from_file", lambda wav=wav: pydub_decode(wav, ".wav"), options))
+        cases.append((f"wav[{label}] native", lambda wav=wav: decode_audio(wav, "wav"), options))
+
+        if not have_ffmpeg:
+            continue
+        for audio_format in COMPRESSED_FORMATS:
+            data = encode(wav, audio_format)
+            name = f"{audio_format}[{label}]"
+            pooled = lambda data, fmt=audio_format: decode_audio(data, fmt)
+            cases.append((f"{name} spawn", lambda data=data: spawn_decode(data), options))
+            if have_ffprobe:
+                cases.append((f"{name} pydub.from_file",
+                              lambda data=data, fmt=audio_format: pydub_decode(data, f".{fmt}"), options))
+            cases.append((f"{name} pool", lambda data=data, pooled=pooled: pooled(data), options))
+
+            suffix = f"x{args.batch}@{args.concurrency}"
+            cases.append((f"{name} spawn {suffix}", batch(spawn_decode, data, args.batch, args.concurrency), batch_options))
+            cases.append((f"{name} pool {suffix}", batch(pooled, data, args.batch, args.concurrency), batch_options))
+
+    print(f"Decoder pool: {decoder.decoder_pool.workers} workers, "
+          f"{'PyAV in-process' if decoder.av is not None else 'pydub/ffmpeg fallback'}")
+    return cases
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Decoder benchmarks: spawn-per-request vs pooled")
+    harness.add_common_arguments(parser, DEFAULT_BASELINE)
+    parser.add_argument("--batch", type=int, default=16, help="Requests per concurrent batch")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent request threads")
+    args = parser.parse_args()
+
+    results = harness.run_cases(build_cases(args), args.name_filter)
+    return harness.finish(args, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Micro-benchmarks for the fraud_engine hot paths.
+
+Usage (from fraud_call_analyzer_adv/):
+    python -m benchmarks.bench_engine --save-baseline     # record a baseline
+    python -m benchmarks.bench_engine                     # compare, exit 1 on regression
+    python -m benchmarks.bench_engine --filter analyze_text --skip-long
+
+ASR is replaced by a canned transcript, so the suite runs fully offline.
+"""
+import argparse
+import base64
+import contextlib
+import os
+import sys
+import tempfile
+
+from benchmarks import harness
+from benchmarks.samples import (
+    AUDIO_DURATIONS, AUDIO_RATES, SAMPLE_TRANSCRIPTS, long_transcript, synthetic_segment, synthetic_wav
+)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline_engine.json")
+
+TEXT_OPTIONS = {"min_iterations": 50, "min_time": 1.0, "max_iterations": 20000}
+AUDIO_OPTIONS = {
+    "5s": {"min_iterations": 5, "min_time": 1.0},
+    "60s": {"min_iterations": 3, "min_time": 1.0},
+    "10min": {"min_iterations": 1, "min_time": 0.0, "warmup": 0},
+}
+
+
+@contextlib.contextmanager
+def offline_asr(transcript: str):
+    """Replaces Google ASR with a fixed transcript for the duration of the block."""
+    import speech_recognition as sr
+    original = sr.Recognizer.recognize_google
+    sr.Recognizer.recognize_google = lambda self, audio_data, *args, **kwargs: transcript
+    try:
+        yield
+    finally:
+        sr.Recognizer.recognize_google = original
+
+
+def text_cases():
+    from fraud_engine.rules import analyze_text
+    from fraud_engine.engine import process_audio_text
+    from fraud_engine.language import detect_language
+
+    acoustics = {"avg_db": -18.0, "silence_ratio": 0.2, "duration_sec": 60.0}
+    cases = []
+    for language, short_text in SAMPLE_TRANSCRIPTS.items():
+        long_text = long_transcript(language)
+        for size, text in (("short", short_text), ("long", long_text)):
+            cases.append((f"analyze_text[{language},{size}]",
+                          lambda text=text: analyze_text(text, acoustics), TEXT_OPTIONS))
+            cases.append((f"analyze_text[{language},{size},explicit]",
+                          lambda text=text, language=language: analyze_text(text, acoustics, language), TEXT_OPTIONS))
+            cases.append((f"detect_language[{language},{size}]",
+                          lambda text=text: detect_language(text), TEXT_OPTIONS))
+            cases.append((f"process_audio_text[text,{language},{size}]",
+                          lambda text=text: process_audio_text(text_input=text), TEXT_OPTIONS))
+    return cases
+
+
+def session_cases():
+    """One more segment of a call already `n` segments long: should not grow with n."""
+    from fraud_engine.session import CallSession
+
+    acoustics = {"avg_db": -18.0, "silence_ratio": 0.2, "duration_sec": 5.0}
+    cases = []
+    for language, text in SAMPLE_TRANSCRIPTS.items():
+        for segments in (1, 100, 1000):
+            session = CallSession("auto")
+            for _ in range(segments):
+                session.add_segment(text, acoustics)
+
+            def score_segment(session=session, text=text):
+                session.add_segment(text, acoustics)
+                return session.verdict()
+            cases.append((f"call_segment[{language},n={segments}]", score_segment, TEXT_OPTIONS))
+    return cases
+
+
+def audio_cases(durations):
+    from fraud_engine.audio_processor import extract_acoustic_features, preprocess_audio
+    from fraud_engine.engine import process_audio_text
+
+    cases = []
+    for label in durations:
+        seconds = AUDIO_DURATIONS[label]
+        options = AUDIO_OPTIONS[label]
+        for rate in AUDIO_RATES:
+            segment = synthetic_segment(seconds, rate)
+            cleaned = preprocess_audio(segment)
+            payload = base64.b64encode(synthetic_wav(seconds, rate)).decode("ascii")
+            suffix = f"[{label},{rate}Hz]"
+            cases.append((f"preprocess_audio{suffix}",
+                          lambda segment=segment: preprocess_audio(segment), options))
+            cases.append((f"extract_acoustic_features{suffix}",
+                          lambda cleaned=cleaned: extract_acoustic_features(cleaned), options))
+            cases.append((f"process_audio_text[audio]{suffix}",
+                          lambda payload=payload: process_audio_text(audio_base64=payload, audio_format="wav"), options))
+    return cases
+
+
+def file_cases(durations, workdir: str):
+    """In-memory vs memory-mapped chunked processing of the same WAV file."""
+    from fraud_engine.audio_processor import process_audio_file
+
+    cases = []
+    for label in durations:
+        seconds = AUDIO_DURATIONS[label]
+        options = AUDIO_OPTIONS[label]
+        for rate in AUDIO_RATES:
+            path = os.path.join(workdir, f"{label}_{rate}.wav")
+            with open(path, "wb") as f:
+                f.write(synthetic_wav(seconds, rate))
+            suffix = f"[{label},{rate}Hz]"
+            cases.append((f"process_audio_file[in-memory]{suffix}",
+                          lambda path=path: process_audio_file(path, chunked=False), options))
+            cases.append((f"process_audio_file[chunked]{suffix}",
+                          lambda path=path: process_audio_file(path, chunked=True), options))
+    return cases
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="fraud_engine micro-benchmarks")
+    harness.add_common_arguments(parser, DEFAULT_BASELINE)
+    parser.add_argument("--skip-long", action="store_true", help="Skip the 10 minute audio cases")
+    parser.add_argument("--text-only", action="store_true", help="Only run the transcript benchmarks")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cases = text_cases() + session_cases()
+        if not args.text_only:
+            durations = [d for d in AUDIO_DURATIONS if not (args.skip_long and d == "10min")]
+            cases += audio_cases(durations)
+            cases += file_cases(durations, workdir)
+
+        with offline_asr(SAMPLE_TRANSCRIPTS["en"]):
+            results = harness.run_cases(cases, args.name_filter)
+
+    return harness.finish(args, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
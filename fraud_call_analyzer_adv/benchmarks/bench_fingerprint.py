@@ -0,0 +1,109 @@
+"""
+Known scam recording lookup: landmark extraction and index lookup at 100k clips.
+
+Usage (from fraud_call_analyzer_adv/):
+    python -m benchmarks.bench_fingerprint --save-baseline
+    python -m benchmarks.bench_fingerprint --clips 20000 --filter lookup
+
+The index holds the real fingerprints of --real-clips synthetic robocalls,
+padded to --clips with generated ones: --hashes-per-clip postings each, half
+of them drawn from the hashes the real clips actually produce so postings
+lists are as skewed as with speech. Queries are a re-encoded known clip, a
+known clip spliced after other audio, and recordings that are not in the index.
+Re-encoded inputs are produced with the ffmpeg binary.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from benchmarks import harness
+from benchmarks.bench_decoder import encode
+from benchmarks.samples import synthetic_robocall
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline_fingerprint.json")
+
+CLIP_SECONDS = 15
+UNKNOWN_SEED = 1 << 20
+OPTIONS = {
+    "lookup": {"min_iterations": 200, "min_time": 1.0},
+    "extract": {"min_iterations": 10, "min_time": 1.0},
+}
+
+
+def build_index(clips: int, hashes_per_clip: int, real_clips: int, seed: int = 0):
+    from fraud_engine.audio_processor import FP_INDEX_SECONDS, fingerprint_audio
+    from fraud_engine.decoder import decode_audio
+    from fraud_engine.fingerprint import OFFSET_MASK, FingerprintIndex
+
+    real = []
+    for i in range(real_clips):
+        audio = decode_audio(synthetic_robocall(i, CLIP_SECONDS), "wav")
+        real.append((f"robocall-{i}", *fingerprint_audio(audio, FP_INDEX_SECONDS)))
+    pool = np.concatenate([hashes for _, hashes, _ in real])
+
+    rng = np.random.default_rng(seed)
+    frames_span = min(OFFSET_MASK, int(CLIP_SECONDS * 8000 / 256))
+
+    def generated():
+        yield from real
+        for i in range(real_clips, clips):
+            half = hashes_per_clip // 2
+            hashes = np.concatenate([rng.choice(pool, half),
+                                     rng.integers(0, 1 << 22, hashes_per_clip - half, dtype=np.uint32)])
+            frames = np.sort(rng.integers(0, frames_span, hashes_per_clip, dtype=np.uint32))
+            yield f"generated-{i}", hashes, frames
+
+    return FingerprintIndex.from_fingerprints(generated())
+
+
+def build_cases(index):
+    from fraud_engine.audio_processor import fingerprint_audio
+    from fraud_engine.decoder import decode_audio
+
+    known = synthetic_robocall(1, CLIP_SECONDS)
+    queries = {
+        "known opus": decode_audio(encode(known, "opus"), "opus"),
+        "known mp3": decode_audio(encode(known, "mp3"), "mp3"),
+        "known spliced": (decode_audio(synthetic_robocall(UNKNOWN_SEED + 1, 10), "wav")
+                          + decode_audio(known, "wav")[5000:]),
+        "unknown": decode_audio(synthetic_robocall(UNKNOWN_SEED, CLIP_SECONDS), "wav"),
+    }
+
+    cases = []
+    for name, audio in queries.items():
+        hashes, frames = fingerprint_audio(audio)
+        match = index.lookup(hashes, frames)
+        print(f"{name:<16} {len(hashes):>5} hashes -> {match}")
+        cases.append((f"lookup[{name}]", lambda hashes=hashes, frames=frames: index.lookup(hashes, frames),
+                      OPTIONS["lookup"]))
+
+    for seconds in (CLIP_SECONDS, 30):
+        audio = decode_audio(synthetic_robocall(2, seconds), "wav")
+        cases.append((f"fingerprint_audio[{seconds}s]", lambda audio=audio: fingerprint_audio(audio),
+                      OPTIONS["extract"]))
+    return cases
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fingerprint extraction and known scam index lookup")
+    harness.add_common_arguments(parser, DEFAULT_BASELINE)
+    parser.add_argument("--clips", type=int, default=100000, help="Clips in the index")
+    parser.add_argument("--hashes-per-clip", type=int, default=420, help="Postings per generated clip (~15s)")
+    parser.add_argument("--real-clips", type=int, default=200, help="Synthetic robocalls fingerprinted for real")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build_index(args.clips, args.hashes_per_clip, args.real_clips)
+    size_mb = (index.offsets.nbytes + index.postings.nbytes + index.clip_hashes.nbytes) / 1024 / 1024
+    print(f"Index: {len(index)} clips, {len(index.postings)} postings, {size_mb:.0f} MB, "
+          f"built in {time.perf_counter() - start:.1f}s")
+
+    results = harness.run_cases(build_cases(index), args.name_filter)
+    return harness.finish(args, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
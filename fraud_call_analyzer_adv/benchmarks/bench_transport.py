@@ -0,0 +1,184 @@
+"""
+Bytes on the wire and end-to-end latency of /analyze uploads over a throttled link.
+
+Usage (from fraud_call_analyzer_adv/):
+    python -m benchmarks.bench_transport
+    python -m benchmarks.bench_transport --server fastapi --uplink-kbps 500 --rtt-ms 200
+
+The server runs in-process behind a local TCP proxy that paces traffic to the
+given bandwidth and adds the round-trip latency, roughly a mobile uplink.
+ASR is replaced by a canned transcript; decoding and acoustics are real.
+Compressed inputs are produced with the ffmpeg binary.
+"""
+import argparse
+import base64
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import zlib
+
+from benchmarks import harness
+from benchmarks.bench_decoder import encode
+from benchmarks.bench_engine import offline_asr
+from benchmarks.samples import SAMPLE_TRANSCRIPTS, synthetic_wav
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline_transport.json")
+
+RATE = 16000
+API_KEY = "fraud_detection_api_key_2026"
+OPTIONS = {"min_iterations": 3, "min_time": 0.0, "warmup": 1}
+PROXY_CHUNK_BYTES = 4096
+
+
+class ThrottledProxy:
+    """TCP proxy pacing each direction to a bandwidth, with a one-way delay per burst."""
+
+    def __init__(self, target_port: int, uplink_kbps: float, downlink_kbps: float, rtt_ms: float):
+        self.target_port = target_port
+        self.uplink = uplink_kbps * 1000 / 8
+        self.downlink = downlink_kbps * 1000 / 8
+        self.delay = rtt_ms / 2000
+        self.bytes_up = 0
+        self.bytes_down = 0
+        self._listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self._listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            client, _ = self._listener.accept()
+            server = socket.create_connection(("127.0.0.1", self.target_port))
+            threading.Thread(target=self._pump, args=(client, server, self.uplink, "bytes_up"), daemon=True).start()
+            threading.Thread(target=self._pump, args=(server, client, self.downlink, "bytes_down"), daemon=True).start()
+
+    def _pump(self, source, destination, bytes_per_sec: float, counter: str):
+        idle = True
+        try:
+            while True:
+                chunk = source.recv(PROXY_CHUNK_BYTES)
+                if not chunk:
+                    break
+                if idle:
+                    time.sleep(self.delay)
+                time.sleep(len(chunk) / bytes_per_sec)
+                destination.sendall(chunk)
+                setattr(self, counter, getattr(self, counter) + len(chunk))
+                # Anything still buffered belongs to the same burst
+                source.setblocking(False)
+                try:
+                    idle = not source.recv(1, socket.MSG_PEEK)
+                except BlockingIOError:
+                    idle = True
+                finally:
+                    source.setblocking(True)
+        except OSError:
+            pass
+        finally:
+            destination.close()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(kind: str) -> int:
+    port = _free_port()
+    if kind == "flask":
+        from werkzeug.serving import make_server
+        from flask_app import app
+        server = make_server("127.0.0.1", port, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    else:
+        import uvicorn
+        from app import app
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.05)
+    return port
+
+
+def make_requests(seconds: float) -> dict:
+    """name -> (path, body, headers) for the same recording in each transport."""
+    wav = synthetic_wav(seconds, RATE)
+    opus = encode(wav, "opus")
+    flac = encode(wav, "flac")
+
+    def as_json(data: bytes, audio_format: str) -> bytes:
+        return json.dumps({"language": "en", "audioFormat": audio_format,
+                           "audioBase64": base64.b64encode(data).decode()}).encode()
+
+    def gzip(data: bytes) -> bytes:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress(data) + compressor.flush()
+
+    json_headers = {"Content-Type": "application/json"}
+    requests = {
+        "wav base64 json": ("/analyze", as_json(wav, "wav"), json_headers),
+        "wav base64 json gzip": ("/analyze", gzip(as_json(wav, "wav")), dict(json_headers, **{"Content-Encoding": "gzip"})),
+        "opus base64 json": ("/analyze", as_json(opus, "opus"), json_headers),
+        "flac binary": ("/analyze/audio?language=en", flac, {"Content-Type": "audio/flac"}),
+        "opus binary": ("/analyze/audio?language=en", opus, {"Content-Type": "audio/ogg; codecs=opus"}),
+    }
+    try:
+        import zstandard
+        requests["wav base64 json zstd"] = ("/analyze", zstandard.ZstdCompressor(level=3).compress(as_json(wav, "wav")),
+                                            dict(json_headers, **{"Content-Encoding": "zstd"}))
+    except ImportError:
+        print("zstandard not installed: zstd case skipped")
+    return requests
+
+
+def post(port: int, path: str, body: bytes, headers: dict):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    try:
+        connection.request("POST", path, body=body, headers=dict(
+            headers, **{"x-api-key": API_KEY, "Accept-Encoding": "zstd, gzip"}))
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{path} returned {response.status}")
+    finally:
+        connection.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Upload size and latency per transport over a throttled link")
+    harness.add_common_arguments(parser, DEFAULT_BASELINE)
+    parser.add_argument("--server", choices=["flask", "fastapi"], default="flask")
+    parser.add_argument("--seconds", type=float, default=10, help="Recording length")
+    parser.add_argument("--uplink-kbps", type=float, default=1000)
+    parser.add_argument("--downlink-kbps", type=float, default=4000)
+    parser.add_argument("--rtt-ms", type=float, default=100)
+    args = parser.parse_args()
+
+    with offline_asr(SAMPLE_TRANSCRIPTS["en"]):
+        proxy = ThrottledProxy(start_server(args.server), args.uplink_kbps, args.downlink_kbps, args.rtt_ms)
+        print(f"{args.server} behind {args.uplink_kbps:g}/{args.downlink_kbps:g} kbps, {args.rtt_ms:g} ms RTT; "
+              f"{args.seconds:g}s recording")
+
+        results = {}
+        for name, (path, body, headers) in make_requests(args.seconds).items():
+            if args.name_filter and args.name_filter not in name:
+                continue
+            proxy.bytes_up = proxy.bytes_down = 0
+            stats = harness.measure(lambda: post(proxy.port, path, body, headers), **OPTIONS)
+            runs = OPTIONS["warmup"] + stats["iterations"] + 1
+            stats["body_bytes"] = len(body)
+            stats["wire_bytes_up"] = proxy.bytes_up // runs
+            stats["wire_bytes_down"] = proxy.bytes_down // runs
+            results[name] = stats
+            print(f"{name:<28} {stats['body_bytes']:>10} B body {stats['wire_bytes_up']:>10} B up "
+                  f"{stats['wire_bytes_down']:>6} B down {stats['mean_ms']:>10.1f} ms (p95 {stats['p95_ms']:.1f})")
+
+    return harness.finish(args, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Shared helpers for the benchmark scripts: timing, peak memory,
+JSON baselines and regression checks.
+"""
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+
+def measure(func, min_iterations: int = 5, min_time: float = 1.0, max_iterations: int = 1000, warmup: int = 1) -> dict:
+    """
+    Times `func()` until both `min_iterations` and `min_time` seconds are reached,
+    then does one extra traced run to record peak Python memory.
+    """
+    for _ in range(warmup):
+        func()
+
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < max_iterations:
+        t0 = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - t0)
+        if len(latencies) >= min_iterations and time.perf_counter() - started >= min_time:
+            break
+    total = sum(latencies)
+
+    # Memory is measured separately: tracemalloc slows every allocation down
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    p95_index = min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))
+    return {
+        "iterations": len(latencies),
+        "ops_per_sec": round(len(latencies) / total, 3) if total > 0 else 0.0,
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(latencies[p95_index] * 1000, 3),
+        "peak_kb": round(peak / 1024, 1)
+    }
+
+
+def run_cases(cases, name_filter: str = None) -> dict:
+    """
+    Runs a list of (name, func, options) cases and prints one line per case.
+    `options` are passed through to `measure`.
+    """
+    results = {}
+    for name, func, options in cases:
+        if name_filter and name_filter not in name:
+            continue
+        stats = measure(func, **options)
+        results[name] = stats
+        print(f"{name:<55} {stats['ops_per_sec']:>10.2f} ops/s "
+              f"{stats['mean_ms']:>10.2f} ms (p95 {stats['p95_ms']:.2f}) "
+              f"{stats['peak_kb']:>10.1f} KB")
+    return results
+
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("cases", {})
+
+
+def save_baseline(path: str, results: dict, merge: bool = True):
+    """Writes results as the new baseline, keeping cases that were not re-run."""
+    cases = load_baseline(path) if merge else {}
+    cases.update(results)
+    with open(path, "w") as f:
+        json.dump({"saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "cases": cases}, f, indent=2, sort_keys=True)
+
+
+def find_regressions(results: dict, baseline: dict, threshold: float, memory_threshold: float) -> list:
+    """
+    Compares results against the baseline.
+    A case regresses when mean latency or peak memory grows by more than the threshold (0.2 = 20%).
+    """
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base["mean_ms"] > 0 and stats["mean_ms"] > base["mean_ms"] * (1 + threshold):
+            regressions.append(f"{name}: mean {base['mean_ms']} ms -> {stats['mean_ms']} ms")
+        if base["peak_kb"] > 0 and stats["peak_kb"] > base["peak_kb"] * (1 + memory_threshold):
+            regressions.append(f"{name}: peak {base['peak_kb']} KB -> {stats['peak_kb']} KB")
+    return regressions
+
+
+def add_common_arguments(parser, default_baseline: str):
+    parser.add_argument("--filter", dest="name_filter", help="Only run cases whose name contains this string")
+    parser.add_argument("--baseline", default=default_baseline, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed latency regression (0.25 = 25%%)")
+    parser.add_argument("--memory-threshold", type=float, default=0.25, help="Allowed peak memory regression")
+    parser.add_argument("--output", help="Also write this run's results to a JSON file")
+
+
+def finish(args, results: dict) -> int:
+    """Saves/compares results according to the common CLI arguments. Returns the process exit code."""
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    regressions = find_regressions(results, baseline, args.threshold, args.memory_threshold)
+    if regressions:
+        print("\nREGRESSIONS:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("\nNo regressions against baseline.")
+    return 0
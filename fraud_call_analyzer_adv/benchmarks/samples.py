@@ -0,0 +1,102 @@
+"""
+Fixed synthetic inputs for the benchmarks, so runs are comparable across machines
+and never touch the network.
+"""
+import array
+import io
+import math
+import random
+import wave
+
+SAMPLE_TRANSCRIPTS = {
+    "en": "Hello sir this is calling from your bank. Your account blocked today, please verify KYC "
+          "and share the OTP immediately or your debit card will expire. It is urgent.",
+    "hi": "Namaste ji main bank se bol raha hoon. Aapka khata block ho gaya hai, turant OTP batao "
+          "aur abhi paise bhej do warna account band ho jayega.",
+    "ta": "Vanakkam sir, naan vangi la irundhu pesaren. Unga kanakku block aagidum, udane "
+          "kuriyeedu sollunga illa na account close aagidum.",
+    "te": "Namaskaram andi, memu bank nundi maatladutunnamu. Mee account block ayyindi, vente "
+          "OTP pampandi lekapothe account close avutundi."
+}
+
+# Long transcripts approximate a 10 minute call (~1500 words)
+LONG_REPEAT = 50
+
+AUDIO_DURATIONS = {"5s": 5, "60s": 60, "10min": 600}
+AUDIO_RATES = [8000, 16000, 44100]
+
+# 2 s cycle: 1.3 s of modulated "voice" then 0.7 s of near silence
+_VOICE_SEC = 1.3
+_CYCLE_SEC = 2.0
+
+
+def long_transcript(language: str) -> str:
+    return " ".join([SAMPLE_TRANSCRIPTS[language]] * LONG_REPEAT)
+
+
+def synthetic_pcm(duration_sec: float, rate: int, seed: int = 1409) -> bytes:
+    """16-bit mono little-endian PCM with alternating speech-like bursts and silence."""
+    rng = random.Random(seed)
+    cycle = array.array("h")
+    voice_frames = int(_VOICE_SEC * rate)
+    for i in range(int(_CYCLE_SEC * rate)):
+        t = i / rate
+        if i < voice_frames:
+            envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 4 * t)
+            value = envelope * (0.6 * math.sin(2 * math.pi * 180 * t) + 0.3 * math.sin(2 * math.pi * 720 * t))
+            value += rng.uniform(-0.05, 0.05)
+        else:
+            value = rng.uniform(-0.002, 0.002)
+        cycle.append(int(value * 12000))
+
+    cycle_bytes = cycle.tobytes()
+    total_bytes = int(duration_sec * rate) * 2
+    repeats = total_bytes // len(cycle_bytes) + 1
+    return (cycle_bytes * repeats)[:total_bytes]
+
+
+def synthetic_wav(duration_sec: float, rate: int) -> bytes:
+    """Same signal as `synthetic_pcm`, wrapped in a WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(synthetic_pcm(duration_sec, rate))
+    return buffer.getvalue()
+
+
+def synthetic_segment(duration_sec: float, rate: int):
+    """pydub AudioSegment of the synthetic signal."""
+    from pydub import AudioSegment
+    return AudioSegment(data=synthetic_pcm(duration_sec, rate), sample_width=2, frame_rate=rate, channels=1)
+
+
+def synthetic_robocall(seed: int, duration_sec: float = 15, rate: int = 16000) -> bytes:
+    """
+    WAV of a distinct "IVR prompt" per seed: syllable-like harmonic tones with
+    random pitch and formants, separated by short pauses.
+    """
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    pieces = []
+    total = int(duration_sec * rate)
+    while sum(len(p) for p in pieces) < total:
+        n = int(rng.uniform(0.08, 0.3) * rate)
+        t = np.arange(n) / rate
+        f0 = rng.uniform(100, 260)
+        formants = rng.uniform(300, 3200, size=3)
+        syllable = sum(np.exp(-((k * f0 - formants[:, None]) / 250) ** 2).sum(axis=0) * np.sin(2 * np.pi * k * f0 * t)
+                       for k in range(1, int(3600 / f0)))
+        pieces.append(syllable * np.hanning(n) / max(1e-9, np.abs(syllable).max()))
+        if rng.random() < 0.3:
+            pieces.append(np.zeros(int(rng.uniform(0.05, 0.25) * rate)))
+    signal = np.concatenate(pieces)[:total] + rng.normal(0, 0.003, total)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes((np.clip(signal, -1, 1) * 12000).astype("<i2").tobytes())
+    return buffer.getvalue()
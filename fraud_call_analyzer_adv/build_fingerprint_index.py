@@ -0,0 +1,70 @@
+import os
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fraud_engine.decoder import decode_audio
+from fraud_engine.audio_processor import FP_INDEX_SECONDS, fingerprint_audio
+from fraud_engine.fingerprint import DEFAULT_INDEX_PATH, FingerprintIndex
+
+EXTENSIONS = ('.wav', '.mp3', '.ogg', '.opus', '.m4a', '.flac', '.webm')
+
+
+def find_recordings(directory_path: str) -> list:
+    """Audio files under `directory_path`, recursively, in a stable order."""
+    files = []
+    for root, _, names in os.walk(directory_path):
+        for name in names:
+            if name.lower().endswith(EXTENSIONS):
+                files.append(os.path.join(root, name))
+    return sorted(files)
+
+
+def fingerprint_file(file_path: str):
+    """(hashes, anchor_frames) of the first FP_INDEX_SECONDS of a recording, or the error message."""
+    try:
+        with open(file_path, "rb") as f:
+            audio = decode_audio(f.read(), os.path.splitext(file_path)[1])
+        return fingerprint_audio(audio, FP_INDEX_SECONDS)
+    except Exception as e:
+        return str(e)
+
+
+def build_index(directory_path: str, output_file: str = DEFAULT_INDEX_PATH, workers: int = None):
+    files = find_recordings(directory_path)
+    print(f"Found {len(files)} known scam recordings in {directory_path}...")
+
+    start = time.perf_counter()
+    fingerprints = []
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for file_path, result in zip(files, pool.map(fingerprint_file, files, chunksize=16)):
+            name = os.path.relpath(file_path, directory_path)
+            if isinstance(result, str):
+                print(f"Error processing {name}: {result}")
+                failed += 1
+                continue
+            hashes, frames = result
+            if len(hashes) == 0:
+                print(f"Skipping {name}: no landmarks (silent or too short)")
+                failed += 1
+                continue
+            fingerprints.append((name, hashes, frames))
+
+    index = FingerprintIndex.from_fingerprints(fingerprints)
+    index.save(output_file)
+
+    size_mb = (index.offsets.nbytes + index.postings.nbytes) / 1024 / 1024
+    print(f"Indexed {len(index)} recordings ({len(index.postings)} landmarks, {size_mb:.1f} MB) "
+          f"in {time.perf_counter() - start:.1f}s, {failed} skipped. Index saved to {output_file}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the fingerprint index of known scam recordings")
+    parser.add_argument("directory", help="Directory of known scam recordings (searched recursively)")
+    parser.add_argument("--output", default=DEFAULT_INDEX_PATH, help="Index file (.npz) the servers load")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+
+    args = parser.parse_args()
+
+    build_index(args.directory, args.output, args.workers)
@@ -1,7 +1,12 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import logging
-from fraud_engine.engine import process_audio_text
+from fraud_engine.codec import FAST_CODEC, JSON_MIMETYPE, decode_request, encode_response
+from fraud_engine.decoder import sniff_format
+from fraud_engine.engine import finalize_call, process_audio_text
+from fraud_engine.quota import KEY_POLICIES, QUEUE_TIMEOUT_SEC, TEXT_COST, estimate_audio_seconds, quota_manager, scheduler
+from fraud_engine.session import session_key
+from fraud_engine.transport import WSGITransport, audio_format_from_content_type
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -9,9 +14,11 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+# gzip/zstd request bodies and compressed responses
+app.wsgi_app = WSGITransport(app.wsgi_app)
 
 # API Key validation
-VALID_API_KEYS = ["fraud_detection_api_key_2026", "HACKATHON_DEMO_2026"]
+VALID_API_KEYS = list(KEY_POLICIES)
 
 def validate_api_key():
     """Validate API key from request headers"""
@@ -20,6 +27,12 @@ def validate_api_key():
         return False
     return True
 
+def frontend_classification(label):
+    """Maps the engine's risk label to the frontend's FRAUD/SAFE; processing errors pass through"""
+    if label == 'ERROR':
+        return label
+    return 'FRAUD' if label != 'SAFE' else 'SAFE'
+
 @app.route("/", methods=["GET"])
 def health():
     """Health check endpoint"""
@@ -40,64 +53,178 @@ def analyze_fraud():
         logger.warning("Invalid API key attempt")
         return jsonify({"error": "Invalid API Key. Unauthorized access."}), 403
     
+    api_key = request.headers.get('x-api-key')
+    
     try:
         # Get JSON data from request
-        data = request.get_json()
+        audio_bytes = None
+        if FAST_CODEC:
+            # Parse the raw body; audio is base64-decoded straight from its bytes
+            try:
+                data = decode_request(request.get_data(cache=False))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            audio_bytes = data.pop('audioBytes')
+        else:
+            data = request.get_json()
         if not data:
             return jsonify({"error": "No JSON data provided"}), 400
         
-        # Extract parameters
-        language = data.get('language', 'en')
-        audio_format = data.get('audioFormat', 'wav')
-        text_input = data.get('textInput')
-        audio_base64 = data.get('audioBase64')
-        audio_url = data.get('audioUrl')
+        return run_analysis(api_key, data, audio_bytes)
         
-        logger.info(f"Processing request - Text input: {bool(text_input)}, Audio: {bool(audio_base64 or audio_url)}")
-        
-        # Validate input
-        if not text_input and not audio_base64 and not audio_url:
-            return jsonify({"error": "Must provide either textInput, audioBase64, or audioUrl"}), 400
-        
-        # Process the request
-        if text_input:
-            # Text-only analysis
-            analysis = process_audio_text(
-                text_input=text_input,
-                audio_format=audio_format
-            )
-        elif audio_base64 or audio_url:
-            # Audio analysis
-            analysis = process_audio_text(
-                audio_base64=audio_base64,
-                audio_url=audio_url,
-                audio_format=audio_format
-            )
-        
-        logger.info(f"Analysis complete - Classification: {analysis.get('label')}, Confidence: {analysis.get('confidence')}")
-        
-        # Map label to classification for frontend
-        label = analysis.get('label', 'SAFE')
-        classification = 'FRAUD' if label != 'SAFE' else 'SAFE'
-        
-        # Return successful response
-        response = {
-            "status": "success",
-            "language": language,
-            "audio_format": audio_format,
-            "classification": classification,
-            "confidence": analysis.get('confidence'),
-            "matched_keywords": analysis.get('matched_keywords', []),
-            "reason": analysis.get('reason', ''),
-            "transcript": analysis.get('transcript', '')
+    except Exception as e:
+        logger.error(f"Analysis error: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Analysis failed: {str(e)}"}), 500
+
+@app.route("/analyze/audio", methods=["POST"])
+def analyze_audio_upload():
+    """
+    Binary audio upload (Opus, FLAC, WAV, ...) without base64.
+    language and audioFormat come from the query string; the format defaults
+    to the Content-Type (e.g. 'audio/ogg; codecs=opus'), then the sniffed container.
+    """
+    logger.info("Received audio upload")
+    
+    if not validate_api_key():
+        logger.warning("Invalid API key attempt")
+        return jsonify({"error": "Invalid API Key. Unauthorized access."}), 403
+    
+    api_key = request.headers.get('x-api-key')
+    
+    try:
+        audio_bytes = request.get_data(cache=False)
+        data = {
+            "language": request.args.get('language', 'auto'),
+            "audioFormat": request.args.get('audioFormat') or audio_format_from_content_type(request.content_type) or sniff_format(audio_bytes) or 'wav',
+            "callId": request.args.get('callId')
         }
-        
-        return jsonify(response)
+        return run_analysis(api_key, data, audio_bytes)
         
     except Exception as e:
         logger.error(f"Analysis error: {str(e)}", exc_info=True)
         return jsonify({"error": f"Analysis failed: {str(e)}"}), 500
 
+def run_analysis(api_key, data, audio_bytes=None):
+    """
+    Quota, fair scheduling and analysis for a parsed request.
+    `audio_bytes` is audio the server already decoded (fast codec or binary upload);
+    it is never taken from the client's JSON.
+    """
+    # Extract parameters
+    language = data.get('language', 'auto')
+    audio_format = data.get('audioFormat', 'wav')
+    text_input = data.get('textInput')
+    audio_base64 = data.get('audioBase64')
+    audio_url = data.get('audioUrl')
+    call_id = data.get('callId')
+    
+    logger.info(f"Processing request - Text input: {bool(text_input)}, Audio: {bool(audio_base64 or audio_url or audio_bytes)}")
+    
+    # Validate input
+    if not text_input and not audio_base64 and not audio_url and not audio_bytes:
+        return jsonify({"error": "Must provide either textInput, audioBase64, or audioUrl"}), 400
+    
+    # Per-key quotas; audio is reserved from its estimated length and settled after analysis
+    is_audio = not text_input
+    cost = estimate_audio_seconds(audio_base64, audio_url, audio_bytes) if is_audio else TEXT_COST
+    reserved = cost if is_audio else 0.0
+    allowed, rate_headers = quota_manager.check(api_key, audio_seconds=reserved)
+    if not allowed:
+        logger.warning("Quota exceeded")
+        return jsonify({"error": "Rate limit exceeded. Retry later."}), 429, rate_headers
+    
+    # Wait for a fair share of the analysis workers
+    measured = 0.0
+    try:
+        if not scheduler.acquire(api_key, cost):
+            return jsonify({"error": "Server busy. Retry later."}), 503, {"Retry-After": str(QUEUE_TIMEOUT_SEC)}
+        
+        # Process the request
+        try:
+            if text_input:
+                # Text-only analysis
+                analysis = process_audio_text(
+                    text_input=text_input,
+                    audio_format=audio_format,
+                    language=language,
+                    call_id=session_key(api_key, call_id) if call_id else None
+                )
+            else:
+                # Audio analysis
+                analysis = process_audio_text(
+                    audio_base64=audio_base64,
+                    audio_url=audio_url,
+                    audio_format=audio_format,
+                    language=language,
+                    audio_bytes=audio_bytes,
+                    call_id=session_key(api_key, call_id) if call_id else None
+                )
+        finally:
+            scheduler.release()
+        
+        if is_audio:
+            # A call segment's acoustics cover the whole call; charge only this segment
+            measured = analysis.get('segment_duration_sec', analysis.get('acoustics', {}).get('duration_sec', 0))
+    finally:
+        # Failed and rejected requests get their reservation back
+        quota_manager.settle_audio(api_key, reserved, measured)
+    
+    logger.info(f"Analysis complete - Classification: {analysis.get('classification')}, Confidence: {analysis.get('confidence')}")
+    
+    # Map label to classification for frontend
+    classification = frontend_classification(analysis.get('classification', 'SAFE'))
+    
+    # Return successful response
+    response = {
+        "status": "success",
+        "language": language,
+        "detected_language": analysis.get('detected_language'),
+        "audio_format": audio_format,
+        "classification": classification,
+        "confidence": analysis.get('confidence'),
+        "matched_keywords": analysis.get('matched_keywords', []),
+        "reason": analysis.get('reason', ''),
+        "transcript": analysis.get('transcript', '')
+    }
+    if call_id:
+        response["call_id"] = call_id
+        response["segments"] = analysis.get('segments')
+        response["segment_duration_sec"] = analysis.get('segment_duration_sec')
+    
+    if FAST_CODEC:
+        return Response(encode_response(response), 200, rate_headers, mimetype=JSON_MIMETYPE)
+    return jsonify(response), 200, rate_headers
+
+@app.route("/analyze/finalize", methods=["POST"])
+def finalize():
+    """Ends a segmented call (see callId on /analyze) and returns its overall verdict"""
+    if not validate_api_key():
+        logger.warning("Invalid API key attempt")
+        return jsonify({"error": "Invalid API Key. Unauthorized access."}), 403
+    
+    api_key = request.headers.get('x-api-key')
+    data = request.get_json(silent=True) or {}
+    call_id = data.get('callId')
+    if not call_id:
+        return jsonify({"error": "Must provide callId"}), 400
+    
+    analysis = finalize_call(session_key(api_key, call_id))
+    if analysis is None:
+        return jsonify({"error": "Unknown or expired callId"}), 404
+    
+    logger.info(f"Call finalized - Classification: {analysis.get('classification')}, Segments: {analysis.get('segments')}")
+    
+    return jsonify({
+        "status": "success",
+        "call_id": call_id,
+        "detected_language": analysis.get('detected_language'),
+        "classification": frontend_classification(analysis.get('classification', 'SAFE')),
+        "confidence": analysis.get('confidence'),
+        "matched_keywords": analysis.get('matched_keywords', []),
+        "reason": analysis.get('reason', ''),
+        "segments": analysis.get('segments')
+    })
+
 @app.route("/detect", methods=["POST"])
 def detect_fraud():
     """Alternative endpoint name for fraud detection"""
@@ -1,17 +1,42 @@
 import speech_recognition as sr
-import base64
 import os
 import io
+import struct
 import tempfile
 import logging
+import numpy as np
 import requests
 from pydub import AudioSegment, effects
 from pydub.silence import detect_silence
+from pydub.utils import db_to_float, ratio_to_db
+from fraud_engine.codec import decode_base64
+from fraud_engine.decoder import decode_audio, is_wav
+from fraud_engine.fingerprint import DT_BITS, FREQ_BITS, get_fingerprint_index
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Silence detection settings shared by the in-memory and chunked paths
+MIN_SILENCE_MS = 500
+SILENCE_OFFSET_DB = 16
+NORMALIZE_HEADROOM_DB = 0.1
+
+# Chunked (memory-mapped) processing for long WAV/PCM recordings
+CHUNK_SECONDS = 30
+CHUNKED_MIN_BYTES = 20 * 1024 * 1024
+
+# Landmark fingerprints: spectral peaks of 8 kHz mono audio, paired into hashes
+FP_RATE = 8000
+FP_WINDOW = 512
+FP_HOP = 256  # 32 ms frames
+FP_PEAK_BINS = 12  # a peak is the maximum of +/- this many frequency bins
+FP_PEAK_FRAMES = 6  # ... and +/- this many frames
+FP_PEAKS_PER_SEC = 10
+FP_FAN_OUT = 3  # pairs per anchor peak
+FP_QUERY_SECONDS = 30  # of each request
+FP_INDEX_SECONDS = 120  # of each known clip (fits the index's 12-bit anchor frames)
+
 def download_audio_from_url(url: str, format: str = "mp3") -> str:
     """
     Downloads audio from a URL to a temp file.
@@ -31,7 +56,7 @@ def download_audio_from_url(url: str, format: str = "mp3") -> str:
 def preprocess_audio(audio: AudioSegment) -> AudioSegment:
     """Normalizes and cleans audio"""
     # 1. Normalize
-    normalized = effects.normalize(audio)
+    normalized = effects.normalize(audio, headroom=NORMALIZE_HEADROOM_DB)
     # 2. Could add band-pass filters here if needed
     return normalized
 
@@ -41,8 +66,8 @@ def extract_acoustic_features(audio: AudioSegment) -> dict:
     dbfs = audio.dBFS if duration > 0 else -100
     
     # Detect silence
-    silence_thresh = audio.dBFS - 16
-    silence_list = detect_silence(audio, min_silence_len=500, silence_thresh=silence_thresh)
+    silence_thresh = audio.dBFS - SILENCE_OFFSET_DB
+    silence_list = detect_silence(audio, min_silence_len=MIN_SILENCE_MS, silence_thresh=silence_thresh)
     
     total_silence = sum((end - start) for start, end in silence_list)
     silence_ratio = (total_silence / len(audio)) if len(audio) > 0 else 0
@@ -53,16 +78,124 @@ def extract_acoustic_features(audio: AudioSegment) -> dict:
         "duration_sec": round(duration, 1)
     }
 
-def process_audio_data(audio_base64: str = None, audio_url: str = None, audio_format: str = "wav") -> dict:
+def transcribe_audio(audio: AudioSegment) -> str:
+    """Google ASR straight from memory, without exporting a WAV for sr.AudioFile"""
+    samples = np.frombuffer(audio.raw_data, dtype=f"<i{audio.sample_width}")
+    if audio.channels > 1:
+        # speech_recognition mixes multi-channel WAVs down by summing channels
+        limit = 2 ** (8 * audio.sample_width - 1)
+        mixed = np.sum(samples.reshape(-1, audio.channels).astype(np.int64), axis=1)
+        samples = np.clip(mixed, -limit, limit - 1).astype(samples.dtype)
+    return _recognize_pcm(sr.Recognizer(), samples.tobytes(), audio.frame_rate, audio.sample_width)
+
+def _max_filter(values: np.ndarray, radius: int, axis: int) -> np.ndarray:
+    """
+    Sliding-window maximum of width 2 * radius + 1 along one axis, by doubling:
+    log2(width) passes over the array instead of one per window element.
+    """
+    size = 2 * radius + 1
+    pad = [(0, 0)] * values.ndim
+    pad[axis] = (radius, radius)
+    result = np.moveaxis(np.pad(values, pad, constant_values=-np.inf), axis, 0)
+    width = 1
+    while width * 2 <= size:
+        result = np.maximum(result[:-width], result[width:])
+        width *= 2
+    # Two overlapping windows of `width` cover `size`
+    overlap = size - width
+    if overlap:
+        result = np.maximum(result[:-overlap], result[overlap:])
+    return np.moveaxis(result, 0, axis)
+
+def fingerprint_samples(samples: np.ndarray, rate: int = FP_RATE) -> tuple:
+    """
+    Landmark hashes of mono samples at FP_RATE (Shazam-style).
+    Peaks of the log spectrogram are local maxima over a time/frequency
+    neighbourhood, thinned to the strongest FP_PEAKS_PER_SEC per second;
+    each anchor peak is paired with the next FP_FAN_OUT peaks within
+    2**DT_BITS frames. Returns (hashes, anchor_frames) as uint32 arrays.
+    """
+    empty = (np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.uint32))
+    if len(samples) < FP_WINDOW:
+        return empty
+
+    frames = np.lib.stride_tricks.sliding_window_view(samples.astype(np.float32), FP_WINDOW)[::FP_HOP]
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(FP_WINDOW).astype(np.float32), axis=1))
+    spectrum = np.log(spectrum[:, 1:(1 << FREQ_BITS) + 1] + 1e-3)  # drop DC, keep 256 bins
+
+    local_max = _max_filter(_max_filter(spectrum, FP_PEAK_BINS, 1), FP_PEAK_FRAMES, 0)
+    floor = np.median(spectrum) + 1.0
+    times, freqs = np.nonzero((spectrum == local_max) & (spectrum > floor))
+    if len(times) < 2:
+        return empty
+
+    # Keep the strongest peaks of each one-second block
+    frames_per_sec = rate / FP_HOP
+    blocks = (times / frames_per_sec).astype(np.int64)
+    order = np.lexsort((-spectrum[times, freqs], blocks))
+    block_start = np.searchsorted(blocks[order], blocks[order], side="left")
+    keep = order[np.arange(len(order)) - block_start < FP_PEAKS_PER_SEC]
+    keep.sort()  # nonzero() order: by time, then frequency
+    times, freqs = times[keep], freqs[keep]
+
+    # Pair each anchor with the next peaks that are 1..2**DT_BITS - 1 frames later
+    search = FP_FAN_OUT + FP_PEAKS_PER_SEC
+    anchors = np.arange(len(times))[:, None]
+    targets = anchors + np.arange(1, search + 1)[None, :]
+    valid = targets < len(times)
+    targets = np.minimum(targets, len(times) - 1)
+    dt = times[targets] - times[anchors]
+    valid &= (dt > 0) & (dt < (1 << DT_BITS))
+    valid &= np.cumsum(valid, axis=1) <= FP_FAN_OUT
+    anchor_idx, target_idx = np.nonzero(valid)
+    target_idx = targets[anchor_idx, target_idx]
+
+    hashes = ((freqs[anchor_idx].astype(np.uint32) << (FREQ_BITS + DT_BITS))
+              | (freqs[target_idx].astype(np.uint32) << DT_BITS)
+              | (times[target_idx] - times[anchor_idx]).astype(np.uint32))
+    return hashes, times[anchor_idx].astype(np.uint32)
+
+def fingerprint_audio(audio: AudioSegment, max_seconds: float = FP_QUERY_SECONDS) -> tuple:
+    """Landmark hashes of the first `max_seconds` of a recording (see fingerprint_samples)."""
+    clip = audio[:int(max_seconds * 1000)].set_channels(1).set_frame_rate(FP_RATE)
+    samples = np.frombuffer(clip.raw_data, dtype=f"<i{clip.sample_width}")
+    return fingerprint_samples(samples)
+
+def match_known_scam(audio: AudioSegment):
+    """Strong match of the recording against the known scam index, or None."""
+    index = get_fingerprint_index()
+    if index is None:
+        return None
+    hashes, frames = fingerprint_audio(audio)
+    return index.lookup(hashes, frames)
+
+def _match_known_scam_file(file_path: str):
+    """match_known_scam for a long 16-bit WAV, reading only the first FP_QUERY_SECONDS from a memory map."""
+    if get_fingerprint_index() is None:
+        return None
+    opened = _open_pcm_samples(file_path)
+    if opened is None:
+        return None
+    samples, rate, channels = opened
+    head = np.ascontiguousarray(samples[:int(FP_QUERY_SECONDS * rate) * channels])
+    return match_known_scam(AudioSegment(data=head.tobytes(), sample_width=2, frame_rate=rate, channels=channels))
+
+def _known_scam_result(match: dict, duration_sec: float) -> dict:
+    """Result of a recording that matched a known scam: no ASR, so no text and only its duration."""
+    logger.info(f"Matched known scam recording {match['clip']} (id {match['clip_id']}, {match['hits']} landmarks)")
+    return {"text": "", "acoustics": {"duration_sec": round(duration_sec, 1)}, "fingerprint_match": match}
+
+def process_audio_data(audio_base64: str = None, audio_url: str = None, audio_format: str = "wav", audio_bytes: bytes = None) -> dict:
     """
-    Decodes base64 OR downloads URL, cleans it, extracts features, and performs ASR.
-    Returns dict with 'text' and 'acoustics'.
+    Decodes base64 OR downloads URL (or takes already decoded `audio_bytes`),
+    cleans it, extracts features, and performs ASR.
+    Returns dict with 'text' and 'acoustics'. A recording matching a known scam
+    clip skips cleaning and ASR and carries 'fingerprint_match' instead.
     """
-    if not audio_base64 and not audio_url:
+    if not audio_base64 and not audio_url and not audio_bytes:
         return {"text": "", "acoustics": {}}
 
     temp_filename = None
-    converted_filename = None
     
     try:
         # Source Handling
@@ -71,36 +204,43 @@ def process_audio_data(audio_base64: str = None, audio_url: str = None, audio_fo
             temp_filename = download_audio_from_url(audio_url, audio_format)
             if not temp_filename:
                 return {"text": "", "acoustics": {}, "error": "Download failed"}
+            with open(temp_filename, "rb") as f:
+                audio_data = f.read()
+        elif audio_bytes:
+            audio_data = audio_bytes
         else:
             # Base64 Handling
-            if "," in audio_base64:
-                audio_base64 = audio_base64.split(",", 1)[1]
-            audio_data = base64.b64decode(audio_base64)
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f".{audio_format}") as temp_audio:
-                temp_audio.write(audio_data)
-                temp_filename = temp_audio.name
+            audio_data = decode_base64(audio_base64)
             
-        # Load and Preprocess
-        raw_audio = AudioSegment.from_file(temp_filename)
+        # Long WAV uploads are analyzed chunk by chunk from a memory map
+        if is_wav(audio_data) and len(audio_data) >= CHUNKED_MIN_BYTES:
+            if not temp_filename:
+                with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
+                    temp_audio.write(audio_data)
+                    temp_filename = temp_audio.name
+            match = _match_known_scam_file(temp_filename)
+            if match:
+                header = _read_wav_header(temp_filename)
+                frame_bytes = header["channels"] * header["sample_width"]
+                return _known_scam_result(match, header["length"] // frame_bytes / header["rate"])
+            chunked_result = process_audio_file_chunked(temp_filename)
+            if chunked_result is not None:
+                return chunked_result
+
+        # Decode in memory and Preprocess
+        raw_audio = decode_audio(audio_data, audio_format)
+        match = match_known_scam(raw_audio)
+        if match:
+            return _known_scam_result(match, len(raw_audio) / 1000.0)
         cleaned_audio = preprocess_audio(raw_audio)
         
         # Extract Features
         acoustics = extract_acoustic_features(cleaned_audio)
         
-        # Save for ASR (always WAV)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as wav_file:
-            cleaned_audio.export(wav_file.name, format="wav")
-            converted_filename = wav_file.name
-            
         # ASR
-        recognizer = sr.Recognizer()
-        with sr.AudioFile(converted_filename) as source:
-            audio_content = recognizer.record(source)
-            try:
-                text = recognizer.recognize_google(audio_content)
-                logger.info(f"Transcription: {text[:30]}...")
-            except (sr.UnknownValueError, sr.RequestError):
-                text = ""
+        text = transcribe_audio(cleaned_audio)
+        if text:
+            logger.info(f"Transcription: {text[:30]}...")
 
         return {
             "text": text,
@@ -114,36 +254,263 @@ def process_audio_data(audio_base64: str = None, audio_url: str = None, audio_fo
     finally:
         if temp_filename and os.path.exists(temp_filename):
             os.remove(temp_filename)
-        if converted_filename and os.path.exists(converted_filename):
-            os.remove(converted_filename)
 
-def process_audio_file(file_path: str) -> dict:
-    """Process local file with full feature extraction"""
+def process_audio_file(file_path: str, chunked: bool = None) -> dict:
+    """
+    Process local file with full feature extraction.
+    `chunked` forces (True) or disables (False) memory-mapped chunked processing;
+    by default it is used for WAV files of at least CHUNKED_MIN_BYTES.
+    """
     if not os.path.exists(file_path):
         return {"text": "", "acoustics": {}}
         
     try:
-        raw_audio = AudioSegment.from_file(file_path)
+        if chunked is None:
+            chunked = file_path.lower().endswith(".wav") and os.path.getsize(file_path) >= CHUNKED_MIN_BYTES
+        if chunked:
+            chunked_result = process_audio_file_chunked(file_path)
+            if chunked_result is not None:
+                return chunked_result
+
+        with open(file_path, "rb") as f:
+            raw_audio = decode_audio(f.read(), os.path.splitext(file_path)[1])
         cleaned_audio = preprocess_audio(raw_audio)
         acoustics = extract_acoustic_features(cleaned_audio)
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as wav_file:
-            cleaned_audio.export(wav_file.name, format="wav")
-            converted_path = wav_file.name
-            
-        recognizer = sr.Recognizer()
-        with sr.AudioFile(converted_path) as source:
-            audio_content = recognizer.record(source)
-            try:
-                text = recognizer.recognize_google(audio_content)
-            except:
-                text = ""
-                
-        if os.path.exists(converted_path):
-            os.remove(converted_path)
+        text = transcribe_audio(cleaned_audio)
             
         return {"text": text, "acoustics": acoustics}
             
     except Exception as e:
         logger.error(f"Error processing file {file_path}: {e}")
         return {"text": "", "acoustics": {}}
+
+
+def _read_wav_header(file_path: str) -> dict:
+    """
+    Walks the RIFF chunks of a WAV file.
+    Returns format info and the byte span of the sample data, or None if it is not a WAV file.
+    """
+    with open(file_path, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            return None
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            chunk_id, size = header[:4], struct.unpack("<I", header[4:])[0]
+
+            if chunk_id == b"fmt ":
+                body = f.read(size + (size % 2))
+                format_tag, channels, rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+                # WAVE_FORMAT_EXTENSIBLE stores the real format in the sub-format GUID
+                if format_tag == 0xFFFE and len(body) >= 26:
+                    format_tag = struct.unpack("<H", body[24:26])[0]
+                fmt = {"format_tag": format_tag, "channels": channels, "rate": rate, "sample_width": bits // 8}
+            elif chunk_id == b"data":
+                if fmt is None:
+                    return None
+                offset = f.tell()
+                # Streamed WAVs often carry a placeholder data size
+                fmt["offset"] = offset
+                fmt["length"] = min(size, os.path.getsize(file_path) - offset)
+                return fmt
+            else:
+                f.seek(size + (size % 2), 1)
+
+
+def _open_pcm_samples(file_path: str, pcm_params: tuple = None):
+    """
+    Memory-maps 16-bit PCM samples from a WAV file, or from a headerless
+    PCM file when `pcm_params` = (rate, channels) is given.
+    Returns (samples, rate, channels), or None for unsupported encodings.
+    """
+    if pcm_params:
+        rate, channels = pcm_params
+        offset, length = 0, os.path.getsize(file_path)
+    else:
+        header = _read_wav_header(file_path)
+        if not header or header["format_tag"] != 1 or header["sample_width"] != 2:
+            return None
+        rate, channels = header["rate"], header["channels"]
+        offset, length = header["offset"], header["length"]
+
+    frames = length // (2 * channels)
+    if frames == 0:
+        return np.zeros(0, dtype="<i2"), rate, channels
+    samples = np.memmap(file_path, dtype="<i2", mode="r", offset=offset, shape=(frames * channels,))
+    return samples, rate, channels
+
+
+def _ms_to_frames(ms, rate: int):
+    """Frame index of a millisecond position, rounded the same way as pydub slicing."""
+    return (np.asarray(ms, dtype=np.int64) * (rate / 1000.0)).astype(np.int64)
+
+
+def _apply_gain(samples: np.ndarray, gain: float) -> np.ndarray:
+    """Same arithmetic as pydub's apply_gain (audioop.mul): scale, clip, floor."""
+    return np.clip(np.floor(samples * gain), -32768, 32767)
+
+
+def scan_normalization(samples: np.ndarray, chunk_samples: int) -> tuple:
+    """
+    First pass over the recording.
+    Builds a sample-value histogram chunk by chunk, from which both the
+    normalization gain and the RMS of the normalized audio follow exactly.
+    Returns (gain, normalized_rms).
+    """
+    histogram = np.zeros(65536, dtype=np.int64)
+    for start in range(0, len(samples), chunk_samples):
+        chunk = samples[start:start + chunk_samples]
+        histogram += np.bincount(chunk.astype(np.int32) + 32768, minlength=65536)
+
+    present = np.nonzero(histogram)[0] - 32768
+    peak = int(np.max(np.abs(present))) if present.size else 0
+
+    # Mirrors effects.normalize: silent audio is left untouched
+    gain = 1.0
+    if peak:
+        target_peak = 32768.0 * db_to_float(-NORMALIZE_HEADROOM_DB)
+        gain = db_to_float(ratio_to_db(target_peak / peak))
+
+    levels = _apply_gain(np.arange(-32768, 32768, dtype=np.float64), gain)
+    sum_squares = float(np.dot(histogram.astype(np.float64), levels * levels))
+    rms = int(np.sqrt(sum_squares / len(samples))) if len(samples) else 0
+    return gain, rms
+
+
+class _SilenceScan:
+    """
+    Streaming equivalent of pydub's detect_silence with seek_step=1.
+    Fed per-millisecond sums of squares; keeps only the last window of bins between chunks.
+    """
+
+    def __init__(self, rate: int, channels: int, frames: int, threshold: float):
+        self.rate = rate
+        self.channels = channels
+        self.frames = frames
+        self.threshold = threshold
+        self.pending = np.zeros(0, dtype=np.int64)
+        self.pending_start = 0
+        self.next_window = 0
+        self.range_start = None
+        self.prev = None
+        self.total_ms = 0
+
+    def feed(self, bin_sums: np.ndarray):
+        bins = np.concatenate([self.pending, bin_sums])
+        base = self.pending_start
+        last_window = base + len(bins) - MIN_SILENCE_MS
+
+        if last_window >= self.next_window:
+            starts = np.arange(self.next_window, last_window + 1)
+            cumulative = np.concatenate([[0], np.cumsum(bins)])
+            sums = cumulative[starts - base + MIN_SILENCE_MS] - cumulative[starts - base]
+            first_frames = _ms_to_frames(starts, self.rate)
+            end_frames = np.minimum(_ms_to_frames(starts + MIN_SILENCE_MS, self.rate), self.frames)
+            counts = (end_frames - first_frames) * self.channels
+            mean_squares = np.divide(sums, counts, out=np.zeros(len(sums)), where=counts > 0)
+            # audioop.rms truncates to an integer before pydub compares it
+            silent = starts[np.floor(np.sqrt(mean_squares)) <= self.threshold]
+            self._merge(silent)
+            self.next_window = last_window + 1
+
+        self.pending = bins[self.next_window - base:]
+        self.pending_start = self.next_window
+
+    def _merge(self, silent: np.ndarray):
+        if not silent.size:
+            return
+        if self.prev is None:
+            points = silent
+            self.range_start = int(silent[0])
+        else:
+            points = np.concatenate([[self.prev], silent])
+
+        # A new range starts only where consecutive silent windows are further apart than a window
+        breaks = np.nonzero(np.diff(points) > MIN_SILENCE_MS)[0]
+        if breaks.size:
+            range_starts = np.concatenate([[self.range_start], points[breaks + 1]])
+            self.total_ms += int(np.sum(points[breaks] + MIN_SILENCE_MS - range_starts[:-1]))
+            self.range_start = int(range_starts[-1])
+        self.prev = int(points[-1])
+
+    def total_silence_ms(self) -> int:
+        if self.prev is None:
+            return self.total_ms
+        return self.total_ms + self.prev + MIN_SILENCE_MS - self.range_start
+
+
+def _recognize_pcm(recognizer: sr.Recognizer, pcm: bytes, rate: int, sample_width: int = 2) -> str:
+    try:
+        return recognizer.recognize_google(sr.AudioData(pcm, rate, sample_width))
+    except (sr.UnknownValueError, sr.RequestError):
+        return ""
+
+
+def process_audio_file_chunked(file_path: str, chunk_sec: int = CHUNK_SECONDS, pcm_params: tuple = None) -> dict:
+    """
+    Constant-memory variant of process_audio_file for 16-bit WAV (or raw PCM with
+    `pcm_params` = (rate, channels)). The file is memory-mapped and scanned twice:
+    once for the normalization gain and level, once to normalize, detect silence
+    and transcribe chunk by chunk. Peak memory depends on `chunk_sec`, not on the
+    recording length, and features match the in-memory path.
+    Returns None if the file is not 16-bit PCM so callers can fall back.
+    """
+    opened = _open_pcm_samples(file_path, pcm_params)
+    if opened is None:
+        return None
+    samples, rate, channels = opened
+
+    frames = len(samples) // channels
+    seg_len = round(1000 * (float(frames) / rate))
+    chunk_ms = max(chunk_sec * 1000, MIN_SILENCE_MS)
+
+    # Pass 1: normalization gain and overall level
+    gain, rms = scan_normalization(samples, int(chunk_ms * rate / 1000) * channels)
+    avg_db = ratio_to_db(rms / 32768.0) if rms else -float("inf")
+    threshold = db_to_float(avg_db - SILENCE_OFFSET_DB) * 32768.0
+
+    # Pass 2: normalize, detect silence and transcribe chunk by chunk
+    silence = _SilenceScan(rate, channels, frames, threshold)
+    recognizer = sr.Recognizer()
+    texts = []
+    for start_ms in range(0, max(seg_len, 1), chunk_ms):
+        end_ms = min(start_ms + chunk_ms, seg_len)
+        first_frame = int(_ms_to_frames(start_ms, rate))
+        last_frame = frames if end_ms >= seg_len else int(_ms_to_frames(end_ms, rate))
+        first_frame = min(first_frame, frames)
+        if last_frame <= first_frame:
+            continue
+
+        chunk = _apply_gain(samples[first_frame * channels:last_frame * channels].astype(np.float64), gain)
+        chunk = chunk.astype(np.int64).reshape(-1, channels)
+
+        frame_squares = np.sum(chunk * chunk, axis=1)
+        edges = np.minimum(_ms_to_frames(np.arange(start_ms, end_ms + 1), rate), frames) - first_frame
+        cumulative = np.concatenate([[0], np.cumsum(frame_squares)])
+        silence.feed(cumulative[edges[1:]] - cumulative[edges[:-1]])
+
+        # speech_recognition mixes multi-channel WAVs down by summing channels
+        mono = np.clip(np.sum(chunk, axis=1), -32768, 32767).astype("<i2")
+        text = _recognize_pcm(recognizer, mono.tobytes(), rate)
+        if text:
+            texts.append(text)
+
+    del samples
+    text = " ".join(texts)
+    if text:
+        logger.info(f"Transcription: {text[:30]}...")
+
+    silence_ratio = (silence.total_silence_ms() / seg_len) if seg_len > 0 else 0
+    duration = seg_len / 1000.0
+    return {
+        "text": text,
+        "acoustics": {
+            "avg_db": round(avg_db if duration > 0 else -100, 2),
+            "silence_ratio": round(silence_ratio, 2),
+            "duration_sec": round(duration, 1)
+        }
+    }
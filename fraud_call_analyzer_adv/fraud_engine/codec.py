@@ -0,0 +1,88 @@
+import binascii
+import os
+import re
+from typing import Optional
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Opt-in: FAST_CODEC=1 makes both servers parse the raw request body with msgspec
+# and encode responses with it, instead of pydantic / request.get_json() / stdlib json.
+FAST_CODEC = os.environ.get("FAST_CODEC", "0") == "1" and msgspec is not None
+
+JSON_MIMETYPE = "application/json"
+
+_ESCAPE = re.compile(rb"\\")
+
+if msgspec is not None:
+    class AnalyzeRequestStruct(msgspec.Struct, rename="camel"):
+        """
+        Typed request body. audioBase64 stays a Raw view into the request bytes
+        so it is never materialised as a Python str.
+        """
+        language: str = "auto"
+        audio_format: str = "wav"
+        text_input: Optional[str] = None
+        audio_url: Optional[str] = None
+        call_id: Optional[str] = None
+        # Raw fields cannot be Optional: an absent field is an empty Raw
+        audio_base64: msgspec.Raw = msgspec.Raw()
+
+    _request_decoder = msgspec.json.Decoder(AnalyzeRequestStruct)
+    _encoder = msgspec.json.Encoder()
+
+
+def decode_base64(value) -> bytes:
+    """
+    Decodes base64 from a str or any bytes-like object (e.g. a memoryview of the
+    request body), skipping a "data:...;base64," prefix. binascii reads ASCII str
+    and buffers in place, so the only allocation is the decoded output.
+    """
+    if isinstance(value, str):
+        comma = value.find(",", 0, 100)
+    else:
+        comma = bytes(value[:100]).find(b",")
+    if comma != -1:
+        value = value[comma + 1:]
+    return binascii.a2b_base64(value)
+
+
+def _decode_raw_base64(raw) -> Optional[bytes]:
+    view = memoryview(raw)
+    if not view or bytes(view[:4]) == b"null":
+        return None
+    if len(view) < 2 or view[0] != ord('"'):
+        raise ValueError("audioBase64 must be a string")
+    content = view[1:-1]
+    if _ESCAPE.search(content):
+        # Escaped JSON string (e.g. "\/" or "\n" line breaks): unescape properly
+        return decode_base64(msgspec.json.decode(raw, type=str))
+    return decode_base64(content)
+
+
+def decode_request(body: bytes) -> dict:
+    """
+    Parses an /analyze body with the fast codec.
+    Returns the same camelCase fields as the JSON body, with the audio already
+    decoded under "audioBytes". Raises ValueError on malformed input.
+    """
+    try:
+        parsed = _request_decoder.decode(body)
+        audio_bytes = _decode_raw_base64(parsed.audio_base64)
+    except (msgspec.DecodeError, binascii.Error) as e:
+        raise ValueError(f"Invalid request body: {e}") from e
+
+    return {
+        "language": parsed.language,
+        "audioFormat": parsed.audio_format,
+        "textInput": parsed.text_input,
+        "audioUrl": parsed.audio_url,
+        "callId": parsed.call_id,
+        "audioBytes": audio_bytes
+    }
+
+
+def encode_response(payload: dict) -> bytes:
+    return _encoder.encode(payload)
@@ -0,0 +1,192 @@
+import io
+import logging
+import os
+import struct
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from pydub import AudioSegment
+
+try:
+    # PyAV decodes in-process with libav, so no ffmpeg/ffprobe subprocess per request
+    import av
+except ImportError:
+    av = None
+
+logger = logging.getLogger(__name__)
+
+PCM_FORMATS = ("pcm", "raw")
+
+# Opus always decodes at 48 kHz; OpusHead records the rate the client recorded at
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+
+# Container hints for the pydub/ffmpeg fallback, by ffmpeg demuxer name
+FFMPEG_DEMUXERS = {"opus": "ogg", "ogg": "ogg", "flac": "flac", "mp3": "mp3"}
+
+# Raw PCM payloads have no header; this is what the mobile client records
+PCM_RATE = 16000
+PCM_CHANNELS = 1
+PCM_SAMPLE_WIDTH = 2
+
+# Compressed formats are decoded by a shared pool of long-lived workers
+DECODER_WORKERS = min(4, os.cpu_count() or 1)
+DECODE_TIMEOUT_SEC = 60
+
+
+def _segment_from_pcm(frames: bytes, rate: int, channels: int, sample_width: int) -> AudioSegment:
+    """
+    Wraps signed little-endian PCM in an AudioSegment.
+    24-bit audio is widened with numpy the same way pydub does it (pydub loops in Python).
+    """
+    frame_width = sample_width * channels
+    frames = frames[:len(frames) - len(frames) % frame_width]
+
+    if sample_width == 3:
+        packed = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        widened = np.empty((len(packed), 4), dtype=np.uint8)
+        widened[:, 0] = np.where(packed[:, 2] > 0x7F, 0xFF, 0x00)
+        widened[:, 1:] = packed
+        frames, sample_width = widened.tobytes(), 4
+
+    return AudioSegment(data=frames, sample_width=sample_width, frame_rate=rate, channels=channels)
+
+
+def is_wav(data: bytes) -> bool:
+    return data[:4] == b"RIFF" and data[8:12] == b"WAVE"
+
+
+def sniff_format(data: bytes):
+    """
+    Container format from the payload's magic bytes, or None if unknown.
+    Clients often label Opus as "ogg"/"webm" or send binary uploads untyped.
+    """
+    head = bytes(data[:64])
+    if is_wav(head):
+        return "wav"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"OggS":
+        return "opus" if b"OpusHead" in head else "ogg"
+    if head[:4] == b"\x1aE\xdf\xa3":
+        return "webm"
+    if head[4:8] == b"ftyp":
+        return "m4a"
+    if head[:3] == b"ID3":
+        return "mp3"
+    return None
+
+
+def opus_input_rate(data: bytes) -> int:
+    """Recording rate from an Ogg Opus header, rounded to a rate Opus supports."""
+    head = bytes(data[:64])
+    offset = head.find(b"OpusHead")
+    if offset == -1 or len(head) < offset + 16:
+        return 48000
+    rate = struct.unpack_from("<I", head, offset + 12)[0]
+    return min((r for r in OPUS_RATES if r >= rate), default=48000)
+
+
+def decode_wav_bytes(data: bytes) -> AudioSegment:
+    """
+    In-process WAV decode with the stdlib wave module.
+    Raises wave.Error for encodings it cannot read (float, WAVE_FORMAT_EXTENSIBLE).
+    """
+    with wave.open(io.BytesIO(data)) as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    if sample_width == 1:
+        # 8-bit WAV is unsigned; pydub works on signed samples
+        frames = (np.frombuffer(frames, dtype=np.uint8) ^ 0x80).tobytes()
+    return _segment_from_pcm(frames, rate, channels, sample_width)
+
+
+def decode_pcm_bytes(data: bytes, rate: int = PCM_RATE, channels: int = PCM_CHANNELS,
+                     sample_width: int = PCM_SAMPLE_WIDTH) -> AudioSegment:
+    """Headerless signed little-endian PCM."""
+    return _segment_from_pcm(data, rate, channels, sample_width)
+
+
+def _decode_with_av(data: bytes, rate: int = None) -> AudioSegment:
+    """Decodes to s16 at `rate` (default: the stream's own rate)."""
+    with av.open(io.BytesIO(data)) as container:
+        stream = container.streams.audio[0]
+        rate = rate or stream.codec_context.sample_rate
+        layout = stream.codec_context.layout
+        resampler = av.AudioResampler(format="s16", layout=layout, rate=rate)
+
+        pieces = []
+        for frame in container.decode(stream):
+            for resampled in resampler.resample(frame):
+                pieces.append(resampled.to_ndarray().tobytes())
+        for resampled in resampler.resample(None):
+            pieces.append(resampled.to_ndarray().tobytes())
+
+    return AudioSegment(data=b"".join(pieces), sample_width=2, frame_rate=rate, channels=layout.nb_channels)
+
+
+def _decode_compressed(data: bytes, audio_format: str = None) -> AudioSegment:
+    if av is not None:
+        # Resample Opus back to the recording rate instead of 48 kHz
+        rate = opus_input_rate(data) if audio_format == "opus" else None
+        return _decode_with_av(data, rate)
+    # Without PyAV this still spawns ffmpeg, but the pool bounds how many run at once
+    return AudioSegment.from_file(io.BytesIO(data), format=FFMPEG_DEMUXERS.get(audio_format))
+
+
+class DecoderPool:
+    """
+    Long-lived decoder threads shared by all requests, capped at `workers`.
+    libav releases the GIL while decoding, so threads decode in parallel.
+    The executor is created lazily so forked server workers each get their own.
+    """
+
+    def __init__(self, workers: int = DECODER_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="decoder")
+                self._pid = os.getpid()
+            return self._executor
+
+    def decode(self, data: bytes, audio_format: str = None, timeout: float = DECODE_TIMEOUT_SEC) -> AudioSegment:
+        return self._get_executor().submit(_decode_compressed, data, audio_format).result(timeout=timeout)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+decoder_pool = DecoderPool()
+
+
+def decode_audio(data: bytes, audio_format: str = "wav") -> AudioSegment:
+    """
+    Decodes an audio payload without touching disk.
+    WAV (detected from the header, whatever the declared format) and raw PCM are
+    decoded in-process; everything else (Opus, FLAC, MP3, ...) goes through the
+    shared decoder pool. The sniffed container wins over the declared format.
+    """
+    audio_format = (audio_format or "").lower().lstrip(".")
+
+    if is_wav(data):
+        try:
+            return decode_wav_bytes(data)
+        except wave.Error as e:
+            logger.info(f"Native WAV decode unavailable ({e}), using decoder pool")
+    elif audio_format in PCM_FORMATS:
+        # Headerless, so never sniffed
+        return decode_pcm_bytes(data)
+
+    return decoder_pool.decode(data, sniff_format(data) or audio_format)
@@ -1,21 +1,28 @@
-from fraud_engine.rules import analyze_text
+from fraud_engine.rules import analyze_text, known_recording_verdict
 from fraud_engine.audio_processor import process_audio_data
+from fraud_engine.session import call_sessions
 
-def process_audio_text(audio_base64: str = None, audio_url: str = None, audio_format: str = "wav", text_input: str = None):
+def process_audio_text(audio_base64: str = None, audio_url: str = None, audio_format: str = "wav", text_input: str = None, language: str = "auto", audio_bytes: bytes = None, call_id: str = None):
     """
     Main entry point for the engine.
     Orchestrates Audio Processing -> Feature Extraction -> Rule Engine.
+    `language` picks the rule shards; "auto" detects it from the transcript.
+    `audio_bytes` is audio already decoded from base64 by the fast codec.
+    With a `call_id` the input is one segment of a call: the result is the
+    verdict for the call so far (see finalize_call).
+    Audio matching a known scam recording is HIGH risk without ASR.
     """
     transcript = ""
     acoustics = {}
+    known_match = None
     
     if text_input:
         transcript = text_input
         # Mock acoustics for text-only input
         acoustics = {"avg_db": -20.0, "silence_ratio": 0.2}
-    elif audio_base64 or audio_url:
+    elif audio_base64 or audio_url or audio_bytes:
         # Full Audio Pipeline
-        result = process_audio_data(audio_base64=audio_base64, audio_url=audio_url, audio_format=audio_format)
+        result = process_audio_data(audio_base64=audio_base64, audio_url=audio_url, audio_format=audio_format, audio_bytes=audio_bytes)
         
         # Propagate processing errors
         if result.get("error"):
@@ -25,17 +32,25 @@ def process_audio_text(audio_base64: str = None, audio_url: str = None, audio_fo
                 "matched_keywords": [],
                 "reason": f"Processing Failed: {result['error']}",
                 "transcript": "",
-                "acoustics": {}
+                "acoustics": {},
+                "detected_language": None
             }
 
         transcript = result.get("text", "")
         acoustics = result.get("acoustics", {})
+        known_match = result.get("fingerprint_match")
     
     # If silence/failure but we have acoustic signal of shouting?
     # We still analyze.
     
+    if call_id is not None:
+        return _score_call_segment(call_id, transcript, acoustics if not text_input else {}, language, known_match)
+
     # Analyze the transcript + acoustics
-    analysis_result = analyze_text(transcript, acoustics)
+    if known_match:
+        analysis_result = known_recording_verdict(known_match, acoustics, language)
+    else:
+        analysis_result = analyze_text(transcript, acoustics, language)
 
     return {
         "classification": analysis_result["label"],
@@ -43,5 +58,47 @@ def process_audio_text(audio_base64: str = None, audio_url: str = None, audio_fo
         "matched_keywords": analysis_result["matched_keywords"],
         "reason": analysis_result["reason"],
         "transcript": transcript,
-        "acoustics": acoustics # Return metadata for debugging/UI
+        "acoustics": acoustics, # Return metadata for debugging/UI
+        "detected_language": analysis_result["language"]
+    }
+
+def _score_call_segment(call_id: str, transcript: str, acoustics: dict, language: str, known_match: dict = None):
+    session = call_sessions.get_or_create(call_id, language)
+    with session.lock:
+        session.add_segment(transcript, acoustics, known_match)
+        analysis_result = session.verdict()
+        segments = session.segments
+
+    return {
+        "classification": analysis_result["label"],
+        "confidence": analysis_result["confidence"],
+        "matched_keywords": analysis_result["matched_keywords"],
+        "reason": analysis_result["reason"],
+        "transcript": transcript,  # this segment's
+        "acoustics": analysis_result["acoustics"],  # whole call so far
+        "segment_duration_sec": acoustics.get("duration_sec", 0),  # this segment's, for quota
+        "detected_language": analysis_result["language"],
+        "segments": segments
+    }
+
+def finalize_call(call_id: str):
+    """
+    Ends a call and returns its overall verdict, or None if the call is
+    unknown or its session expired.
+    """
+    session = call_sessions.pop(call_id)
+    if session is None:
+        return None
+    with session.lock:
+        analysis_result = session.verdict()
+        segments = session.segments
+
+    return {
+        "classification": analysis_result["label"],
+        "confidence": analysis_result["confidence"],
+        "matched_keywords": analysis_result["matched_keywords"],
+        "reason": analysis_result["reason"],
+        "acoustics": analysis_result["acoustics"],
+        "detected_language": analysis_result["language"],
+        "segments": segments
     }
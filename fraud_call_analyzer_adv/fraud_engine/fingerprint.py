@@ -0,0 +1,144 @@
+import hashlib
+import logging
+import os
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Landmark hash layout: anchor frequency bin (8 bits), target frequency bin (8 bits),
+# frame distance (6 bits). Hashes index a dense offsets table of 2**HASH_BITS entries.
+FREQ_BITS = 8
+DT_BITS = 6
+HASH_BITS = 2 * FREQ_BITS + DT_BITS
+
+# A posting packs (clip id, anchor frame) into one uint32, so 100k clips with
+# ~420 hashes per 15-second clip take ~180 MB with the offsets table
+OFFSET_BITS = 12
+CLIP_BITS = 32 - OFFSET_BITS
+OFFSET_MASK = (1 << OFFSET_BITS) - 1
+MAX_CLIPS = 1 << CLIP_BITS
+
+# Hashes shared by more clips than this carry no information and are dropped at build time
+MAX_POSTINGS_PER_HASH = 5000
+
+# A strong match: enough landmark hashes agreeing on one time alignment with one clip,
+# relative to the shorter of the query and the clip
+MIN_MATCH_HITS = 20
+MIN_MATCH_SCORE = 0.1
+
+DEFAULT_INDEX_PATH = os.environ.get(
+    "FINGERPRINT_INDEX", os.path.join(os.path.dirname(__file__), "data", "scam_fingerprints.npz"))
+
+
+class FingerprintIndex:
+    """
+    Inverted index from landmark hash to (clip, anchor frame) postings, stored as
+    flat numpy arrays: postings[offsets[h]:offsets[h + 1]] are the postings of hash h.
+    A lookup gathers the postings of the query's hashes and votes on (clip, time shift);
+    a re-encoded copy of a clip lines up many hashes at a single shift.
+    """
+
+    def __init__(self, offsets: np.ndarray, postings: np.ndarray, clip_names: np.ndarray, clip_hashes: np.ndarray):
+        self.offsets = offsets
+        self.postings = postings
+        self.clip_names = clip_names
+        self.clip_hashes = clip_hashes
+
+    def __len__(self) -> int:
+        return len(self.clip_names)
+
+    @classmethod
+    def from_fingerprints(cls, fingerprints) -> "FingerprintIndex":
+        """Builds an index from (name, hashes, anchor_frames) triples, one per clip."""
+        names, hash_arrays, posting_arrays = [], [], []
+        for clip_id, (name, hashes, frames) in enumerate(fingerprints):
+            if clip_id >= MAX_CLIPS:
+                raise ValueError(f"Index is limited to {MAX_CLIPS} clips")
+            keep = frames <= OFFSET_MASK
+            names.append(name)
+            hash_arrays.append(hashes[keep].astype(np.uint32))
+            posting_arrays.append((np.uint32(clip_id) << OFFSET_BITS) | frames[keep].astype(np.uint32))
+
+        clip_hashes = np.array([len(h) for h in hash_arrays], dtype=np.uint32)
+        hashes = np.concatenate(hash_arrays) if hash_arrays else np.empty(0, dtype=np.uint32)
+        postings = np.concatenate(posting_arrays) if posting_arrays else np.empty(0, dtype=np.uint32)
+
+        counts = np.bincount(hashes, minlength=1 << HASH_BITS)
+        common = counts > MAX_POSTINGS_PER_HASH
+        if common.any():
+            keep = ~common[hashes]
+            hashes, postings = hashes[keep], postings[keep]
+            counts[common] = 0
+
+        order = np.argsort(hashes, kind="stable")
+        offsets = np.zeros((1 << HASH_BITS) + 1, dtype=np.uint32)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(offsets, postings[order], np.array(names, dtype=str), clip_hashes)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(f, offsets=self.offsets, postings=self.postings,
+                     clip_names=self.clip_names, clip_hashes=self.clip_hashes)
+
+    @classmethod
+    def load(cls, path: str) -> "FingerprintIndex":
+        with np.load(path) as data:
+            return cls(data["offsets"], data["postings"], data["clip_names"], data["clip_hashes"])
+
+    def lookup(self, hashes: np.ndarray, frames: np.ndarray):
+        """
+        Best matching clip for a query's landmark hashes and anchor frames.
+        Returns {"clip", "clip_id", "hits", "score"}, or None unless the match is strong.
+        "clip" is the indexed file path, for server logs only; clients get "clip_id".
+        """
+        if len(hashes) == 0 or len(self) == 0:
+            return None
+        starts = self.offsets[hashes].astype(np.int64)
+        counts = self.offsets[hashes + 1].astype(np.int64) - starts
+        total = int(counts.sum())
+        if total == 0:
+            return None
+
+        # Postings of every query hash, gathered in one pass
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+        postings = self.postings[positions]
+        clips = (postings >> OFFSET_BITS).astype(np.int64)
+        shifts = (postings & OFFSET_MASK).astype(np.int64) - np.repeat(frames.astype(np.int64), counts)
+
+        # Vote on (clip, shift); shifts lie in (-2**OFFSET_BITS, 2**OFFSET_BITS) for in-range queries
+        keys = (clips << (OFFSET_BITS + 2)) | (shifts + (2 << OFFSET_BITS))
+        values, votes = np.unique(keys, return_counts=True)
+        best = int(votes.argmax())
+        hits = int(votes[best])
+        clip = int(values[best] >> (OFFSET_BITS + 2))
+        score = hits / max(1, min(len(hashes), int(self.clip_hashes[clip])))
+        if hits < MIN_MATCH_HITS or score < MIN_MATCH_SCORE:
+            return None
+        name = str(self.clip_names[clip])
+        return {"clip": name, "clip_id": clip_id(name), "hits": hits, "score": round(score, 3)}
+
+
+def clip_id(name: str) -> str:
+    """Opaque, rebuild-stable id of an indexed clip, so responses do not expose the index's file layout."""
+    return hashlib.blake2b(name.encode(), digest_size=6).hexdigest()
+
+
+_index = None
+_index_loaded = False
+_index_lock = threading.Lock()
+
+
+def get_fingerprint_index():
+    """The index of known scam recordings (DEFAULT_INDEX_PATH), loaded once; None if none was built."""
+    global _index, _index_loaded
+    if not _index_loaded:
+        with _index_lock:
+            if not _index_loaded:
+                if os.path.exists(DEFAULT_INDEX_PATH):
+                    _index = FingerprintIndex.load(DEFAULT_INDEX_PATH)
+                    logger.info(f"Loaded fingerprints of {len(_index)} known scam recordings")
+                _index_loaded = True
+    return _index
@@ -0,0 +1,96 @@
+import math
+import re
+from collections import Counter
+
+SUPPORTED_LANGUAGES = ["en", "hi", "ta", "te"]
+DEFAULT_LANGUAGE = "en"
+
+# Unicode blocks of the native scripts
+SCRIPT_RANGES = {
+    "hi": (0x0900, 0x097F),  # Devanagari
+    "ta": (0x0B80, 0x0BFF),  # Tamil
+    "te": (0x0C00, 0x0C7F),  # Telugu
+}
+
+# Common romanized words per language, used to build character trigram profiles
+# for Latin-script (ASR or typed) transcripts
+SEED_WORDS = {
+    "en": "the is you your and to this will have please account sir we are from with for that "
+          "it be not of call your need can share now today number",
+    "hi": "hai hain aap aapka kya nahi mein main ka ki ko se raha rahe kar karo ho ji yeh woh "
+          "kijiye hoon jayega warna bol abhi turant khata paise bhej batao gaya band",
+    "ta": "naan unga ungal illa enna irukku irundhu sollunga pannunga vanakkam aagidum pesaren "
+          "vangi kanakku udane kuriyeedu venum sari romba inga enga",
+    "te": "meeru mee memu andi ledu undi cheyyandi emi nenu ela kaadu avutundi ayyindi "
+          "maatladutunnamu nundi pampandi vente namaskaram lekapothe cheppandi ivvandi"
+}
+
+NON_LETTERS = re.compile(r"[\W\d_]+")
+
+# Only the start of long transcripts is inspected, so detection cost is bounded
+MAX_DETECT_CHARS = 600
+
+
+def _trigram_counts(text: str) -> Counter:
+    """Character trigrams of the words in `text`, each word padded with spaces."""
+    padded = " " + "  ".join(text.split()) + " "
+    counts = Counter(map("".join, zip(padded, padded[1:], padded[2:])))
+    # Drop the grams spanning the double space between words
+    return Counter({g: c for g, c in counts.items() if "  " not in g})
+
+
+def _build_profiles() -> dict:
+    """
+    Per-language add-one smoothed trigram log-probabilities, stored as the score
+    of an unseen gram plus a bonus for each gram present in the profile.
+    """
+    profiles = {}
+    for language, words in SEED_WORDS.items():
+        counts = _trigram_counts(words)
+        total = sum(counts.values())
+        vocabulary = len(counts) + 1
+        unseen = math.log(1 / (total + vocabulary))
+        bonus = {g: math.log((c + 1) / (total + vocabulary)) - unseen for g, c in counts.items()}
+        profiles[language] = (bonus, unseen)
+    return profiles
+
+
+PROFILES = _build_profiles()
+
+
+def normalize_language(language: str) -> str:
+    """
+    Maps a request's language field to a supported code ('hi-IN' -> 'hi').
+    Returns 'auto' for empty/auto values (and non-strings from loosely parsed JSON)
+    and None for unsupported languages.
+    """
+    if not isinstance(language, str) or not language or language.lower() == "auto":
+        return "auto"
+    code = language.lower().replace("_", "-").split("-")[0]
+    return code if code in SUPPORTED_LANGUAGES else None
+
+
+def detect_language(text: str) -> str:
+    """
+    Cheap language guess: native script first, then romanized character trigrams.
+    """
+    sample = text[:MAX_DETECT_CHARS].lower()
+
+    script_counts = Counter()
+    for char in ("" if sample.isascii() else sample):
+        code_point = ord(char)
+        for language, (low, high) in SCRIPT_RANGES.items():
+            if low <= code_point <= high:
+                script_counts[language] += 1
+                break
+    if script_counts:
+        return script_counts.most_common(1)[0][0]
+
+    counts = _trigram_counts(NON_LETTERS.sub(" ", sample))
+    if not counts:
+        return DEFAULT_LANGUAGE
+    total = sum(counts.values())
+    scores = {}
+    for language, (bonus, unseen) in PROFILES.items():
+        scores[language] = total * unseen + sum(bonus[g] * counts[g] for g in counts.keys() & bonus.keys())
+    return max(scores, key=scores.get)
@@ -0,0 +1,282 @@
+import asyncio
+import base64
+import heapq
+import itertools
+import math
+import os
+import struct
+import threading
+import time
+
+# Per-key quotas. "weight" is the key's share of analysis capacity under contention:
+# the mobile app's interactive traffic outweighs batch/demo keys, which use spare capacity.
+KEY_POLICIES = {
+    "fraud_detection_api_key_2026": {
+        "requests_per_sec": 5, "request_burst": 20, "audio_sec_per_min": 600, "weight": 10
+    },
+    "HACKATHON_DEMO_2026": {
+        "requests_per_sec": 2, "request_burst": 10, "audio_sec_per_min": 1800, "weight": 1
+    }
+}
+DEFAULT_POLICY = {"requests_per_sec": 1, "request_burst": 5, "audio_sec_per_min": 120, "weight": 1}
+
+# Concurrent analyses; everything else waits in the fair queue
+ANALYSIS_SLOTS = os.cpu_count() or 2
+QUEUE_TIMEOUT_SEC = 30
+
+# Scheduling cost, in estimated seconds of audio
+TEXT_COST = 0.1
+URL_AUDIO_COST = 60.0
+COMPRESSED_BYTES_PER_SEC = 8000  # ~64 kbps, typical for mobile voice recordings
+OPUS_BYTES_PER_SEC = 3000  # ~24 kbps Opus voice
+HEADER_BYTES = 48  # enough for WAV fmt, FLAC STREAMINFO and OpusHead
+
+
+def get_policy(api_key: str) -> dict:
+    return KEY_POLICIES.get(api_key, DEFAULT_POLICY)
+
+
+class TokenBucket:
+    """Classic token bucket, refilled lazily on access. Tokens may go negative (post-paid usage)."""
+
+    def __init__(self, capacity: float, refill_per_sec: float, now: float = None):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.tokens = capacity
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float):
+        if now <= self.updated:
+            return
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_sec)
+        self.updated = now
+
+    def charge(self, amount: float, now: float):
+        """Takes `amount` tokens, or gives them back when negative (never above capacity)."""
+        self._refill(now)
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+    def seconds_until(self, amount: float) -> float:
+        """Time until `amount` tokens are available (call after a refill)."""
+        if amount <= 0:
+            return 0.0
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.refill_per_sec)
+
+
+class QuotaManager:
+    """
+    Per-key requests/sec and audio-seconds/min buckets, O(1) per check.
+    Audio is reserved at admission from the estimated duration, so concurrent
+    uploads cannot all be admitted on one bucket, and settled after analysis
+    with the real duration; a key in debt is rejected until its bucket refills.
+    """
+
+    def __init__(self, policies: dict = None):
+        self.policies = KEY_POLICIES if policies is None else policies
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _get_buckets(self, api_key: str, now: float) -> tuple:
+        buckets = self._buckets.get(api_key)
+        if buckets is None:
+            policy = self.policies.get(api_key, DEFAULT_POLICY)
+            buckets = (TokenBucket(policy["request_burst"], policy["requests_per_sec"], now),
+                       TokenBucket(policy["audio_sec_per_min"], policy["audio_sec_per_min"] / 60.0, now))
+            self._buckets[api_key] = buckets
+        return buckets
+
+    def check(self, api_key: str, audio_seconds: float = 0.0) -> tuple:
+        """
+        Admits one request, reserving `audio_seconds` (the pre-decode estimate) from the
+        audio bucket; settle_audio() corrects it once the real duration is known.
+        Returns (allowed, headers); headers carry the rate-limit state and, when
+        rejected, Retry-After.
+        """
+        with self._lock:
+            # Read the clock under the lock, so buckets only ever move forward in time
+            now = time.monotonic()
+            requests, audio = self._get_buckets(api_key, now)
+            requests._refill(now)
+            audio._refill(now)
+            # A clip longer than the whole audio burst is admitted once the bucket is full
+            allowed = (requests.tokens >= 1
+                       and (audio_seconds <= 0 or audio.tokens >= min(audio_seconds, audio.capacity)))
+            if allowed:
+                requests.tokens -= 1
+                audio.tokens -= audio_seconds
+            else:
+                retry_after = max(requests.seconds_until(1), audio.seconds_until(audio_seconds))
+            headers = self._headers(requests, audio)
+
+        if not allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+        return allowed, headers
+
+    def settle_audio(self, api_key: str, reserved: float, seconds: float):
+        """Replaces an admission reservation with the measured audio duration (0 refunds it)."""
+        if reserved == seconds:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._get_buckets(api_key, now)[1].charge(max(0.0, seconds) - reserved, now)
+
+    @staticmethod
+    def _headers(requests: TokenBucket, audio_seconds: TokenBucket) -> dict:
+        return {
+            "X-RateLimit-Limit": str(int(requests.capacity)),
+            "X-RateLimit-Remaining": str(max(0, int(requests.tokens))),
+            "X-RateLimit-Reset": str(math.ceil(requests.seconds_until(requests.capacity))),
+            "X-RateLimit-Audio-Limit": str(int(audio_seconds.capacity)),
+            "X-RateLimit-Audio-Remaining": str(max(0, int(audio_seconds.tokens)))
+        }
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(True)
+
+
+class _Waiter:
+    """A queued request: a thread blocked on an Event, or a coroutine awaiting a Future."""
+
+    __slots__ = ("event", "loop", "future", "granted", "cancelled")
+
+    def __init__(self, loop=None):
+        self.loop = loop
+        self.future = loop.create_future() if loop is not None else None
+        self.event = threading.Event() if loop is None else None
+        self.granted = False
+        self.cancelled = False
+
+    def grant(self):
+        """Hands the waiter a slot; called under the scheduler lock, from any thread."""
+        self.granted = True
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+class FairScheduler:
+    """
+    Weighted fair queuing (start-time fair queuing) of analysis work across keys.
+    Each request gets a virtual finish tag = start + cost / weight; when a slot
+    frees up the waiting request with the smallest tag runs next. A key that
+    floods the queue only pushes its own tags further out, so interactive keys
+    keep low latency while batch keys soak up idle capacity.
+    Threads wait with acquire(); ASGI handlers await acquire_async(), so queued
+    requests do not tie up the server's worker threads.
+    """
+
+    def __init__(self, slots: int = ANALYSIS_SLOTS):
+        self.slots = slots
+        self._active = 0
+        self._queue = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish = {}
+        self._lock = threading.Lock()
+
+    def _enqueue(self, api_key: str, cost: float, loop=None):
+        """Takes a free slot (returns None) or queues a waiter by its finish tag."""
+        weight = get_policy(api_key)["weight"]
+        with self._lock:
+            start = max(self._virtual_time, self._last_finish.get(api_key, 0.0))
+            finish = start + cost / weight
+            self._last_finish[api_key] = finish
+            if self._active < self.slots and not self._queue:
+                self._active += 1
+                self._virtual_time = max(self._virtual_time, start)
+                return None
+            waiter = _Waiter(loop)
+            heapq.heappush(self._queue, (finish, next(self._sequence), start, waiter))
+            return waiter
+
+    def _cancel(self, waiter: _Waiter) -> bool:
+        """Gives up waiting. Returns True if the slot was granted in the meantime."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            waiter.cancelled = True  # skipped by release()
+            return False
+
+    def acquire(self, api_key: str, cost: float, timeout: float = QUEUE_TIMEOUT_SEC) -> bool:
+        """Blocks until a slot is granted. Returns False if `timeout` expires first."""
+        waiter = self._enqueue(api_key, cost)
+        if waiter is None or waiter.event.wait(timeout):
+            return True
+        return self._cancel(waiter)
+
+    async def acquire_async(self, api_key: str, cost: float, timeout: float = QUEUE_TIMEOUT_SEC) -> bool:
+        """acquire() for coroutines: waits on the event loop instead of blocking a thread."""
+        waiter = self._enqueue(api_key, cost, asyncio.get_running_loop())
+        if waiter is None:
+            return True
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return self._cancel(waiter)
+        except asyncio.CancelledError:
+            # Client went away; pass on a slot granted while we were being cancelled
+            if self._cancel(waiter):
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            while self._queue:
+                _, _, start, waiter = heapq.heappop(self._queue)
+                if waiter.cancelled:
+                    continue
+                # Hand the slot straight to the next request
+                self._virtual_time = max(self._virtual_time, start)
+                waiter.grant()
+                return
+            self._active -= 1
+
+    def queued(self) -> int:
+        with self._lock:
+            return sum(1 for entry in self._queue if not entry[3].cancelled)
+
+
+def _seconds_from_size(header: bytes, size: int) -> float:
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE" and header[12:16] == b"fmt ":
+        byte_rate = struct.unpack("<I", header[28:32])[0]
+        if byte_rate:
+            return size / byte_rate
+    if header[:4] == b"fLaC" and len(header) >= 26:
+        # STREAMINFO: 20-bit sample rate, then 36-bit total sample count
+        packed = int.from_bytes(header[18:26], "big")
+        rate, total_samples = packed >> 44, packed & (2 ** 36 - 1)
+        if rate and total_samples:
+            return total_samples / rate
+    if header[:4] == b"OggS" and b"OpusHead" in header:
+        return size / OPUS_BYTES_PER_SEC
+    return size / COMPRESSED_BYTES_PER_SEC
+
+
+def estimate_audio_seconds(audio_base64: str = None, audio_url: str = None, audio_bytes: bytes = None) -> float:
+    """
+    Cheap pre-decode estimate of a request's audio length, used as its scheduling cost.
+    WAV and FLAC durations are read from the header; other formats assume a typical bitrate.
+    """
+    if audio_bytes:
+        return _seconds_from_size(bytes(audio_bytes[:HEADER_BYTES]), len(audio_bytes))
+    if audio_base64:
+        # Skip a data-URL prefix without copying the payload
+        offset = audio_base64.find(",", 0, 100) + 1
+        size = (len(audio_base64) - offset) * 3 // 4
+        try:
+            header = base64.b64decode(audio_base64[offset:offset + HEADER_BYTES * 4 // 3])
+        except ValueError:
+            header = b""
+        return _seconds_from_size(header, size)
+    if audio_url:
+        return URL_AUDIO_COST
+    return TEXT_COST
+
+
+quota_manager = QuotaManager()
+scheduler = FairScheduler()
@@ -1,53 +1,125 @@
 import re
+from fraud_engine.language import DEFAULT_LANGUAGE, detect_language, normalize_language
 
-# Multilingual + weighted fraud indicators
+# Multilingual + weighted fraud indicators, sharded by language.
+# "core" holds banking/app terms that show up in every language (code-mixed speech).
 FRAUD_PATTERNS = {
+    "core": {
+        "otp": 0.4,
+        "one time password": 0.4,
+        "account blocked": 0.4,
+        "account block": 0.4,
+        "bank": 0.2,
+        "upi": 0.3,
+        "pin": 0.4,
+        "kyc": 0.3,
+        "refund": 0.3,
+        "lottery": 0.4,
+        "cvv": 0.5,
+        "credit card": 0.3,
+        "debit card": 0.3,
+        "anydesk": 0.5,
+        "teamviewer": 0.5,
+        "quicksupport": 0.5
+    },
+
     # English
-    "otp": 0.4,
-    "one time password": 0.4,
-    "account blocked": 0.4,
-    "bank": 0.2,
-    "verify": 0.3,
-    "urgent": 0.3,
-    "immediately": 0.25,
-    "click": 0.3,
-    "transfer": 0.3,
-    "upi": 0.3,
-    "pin": 0.4,
-    "kyc": 0.3,
-    "refund": 0.3,
-    "lottery": 0.4,
-    "expire": 0.3,
-    "cvv": 0.5,
-    "credit card": 0.3,
-    "debit card": 0.3,
-    "download": 0.2,
-    "anydesk": 0.5,
-    "teamviewer": 0.5,
-    "quicksupport": 0.5,
-    
+    "en": {
+        "verify": 0.3,
+        "urgent": 0.3,
+        "immediately": 0.25,
+        "click": 0.3,
+        "transfer": 0.3,
+        "expire": 0.3,
+        "download": 0.2
+    },
+
     # Hindi
-    "turant": 0.25,
-    "abhi": 0.2,
-    "khata": 0.3,
-    "bank se": 0.3,
-    "otp batao": 0.5,
-    "bhej": 0.2,
-    "paise": 0.2,
-    "block ho gaya": 0.4,
-    
+    "hi": {
+        "turant": 0.25,
+        "abhi": 0.2,
+        "khata": 0.3,
+        "bank se": 0.3,
+        "otp batao": 0.5,
+        "bhej": 0.2,
+        "paise": 0.2,
+        "block ho gaya": 0.4,
+        "तुरंत": 0.25,
+        "अभी": 0.2,
+        "खाता": 0.3,
+        "ओटीपी": 0.4,
+        "भेज": 0.2,
+        "पैसे": 0.2,
+        "ब्लॉक हो गया": 0.4
+    },
+
     # Tamil
-    "vangi": 0.2,
-    "kanakku": 0.2,
-    "udane": 0.25,
-    "kuriyeedu": 0.3,
-    
+    "ta": {
+        "vangi": 0.2,
+        "kanakku": 0.2,
+        "udane": 0.25,
+        "kuriyeedu": 0.3,
+        "வங்கி": 0.2,
+        "கணக்கு": 0.2,
+        "உடனே": 0.25,
+        "குறியீடு": 0.3
+    },
+
     # Telugu
-    "vente": 0.25,
-    "pampandi": 0.2,
-    "account block": 0.4
+    "te": {
+        "vente": 0.25,
+        "pampandi": 0.2,
+        "వెంటనే": 0.25,
+        "పంపండి": 0.2
+    }
+}
+
+# Shards scanned for each language. Indian-language calls are usually
+# code-mixed with English, so they also get the English shard.
+LANGUAGE_SHARDS = {
+    "en": ["core", "en"],
+    "hi": ["core", "en", "hi"],
+    "ta": ["core", "en", "ta"],
+    "te": ["core", "en", "te"]
 }
 
+
+def _compile_shard(patterns: dict) -> tuple:
+    """Freezes a shard into a tuple of (phrase, weight) pairs for scanning."""
+    return tuple(patterns.items())
+
+
+COMPILED_SHARDS = {name: _compile_shard(patterns) for name, patterns in FRAUD_PATTERNS.items()}
+
+
+def _contains_phrase(text_lower: str, phrase: str) -> bool:
+    """
+    Substring search where the phrase must start on a word boundary, so "abhi"
+    does not hit "kabhi" while inflections like "blocked" or "bhejo" still match.
+    """
+    index = text_lower.find(phrase)
+    while index != -1:
+        if index == 0 or not text_lower[index - 1].isalnum():
+            return True
+        index = text_lower.find(phrase, index + 1)
+    return False
+
+
+def match_patterns(text_lower: str, shards: list) -> list:
+    """Returns (phrase, weight) pairs of the given shards found in the text."""
+    return [(phrase, weight)
+            for shard in shards
+            for phrase, weight in COMPILED_SHARDS[shard]
+            if _contains_phrase(text_lower, phrase)]
+
+
+def resolve_language(text: str, language: str = "auto") -> str:
+    """Supported language code for the request; 'auto' and unknown values are detected from the text."""
+    code = normalize_language(language)
+    if code in (None, "auto"):
+        code = detect_language(text) if text else DEFAULT_LANGUAGE
+    return code
+
 # Regex for sensitive data patterns (Data Leakage)
 SENSITIVE_REGEX = {
     "OTP_Pattern": r"\b\d{4,6}\b",  # 4-6 digit codes
@@ -57,12 +129,31 @@ SENSITIVE_REGEX = {
 
 URGENCY_WORDS = ["urgent", "immediately", "now", "within", "last chance", "final warning", "turant", "udane"]
 
-def analyze_text(text: str, acoustics: dict = None):
+# Sensitive number patterns only count when one of these appears too
+SENSITIVE_CONTEXT_WORDS = ["otp", "code", "pin"]
+
+def scan_text(text: str, language: str) -> dict:
+    """
+    Text signals of a transcript (or of a window of one): fraud phrases of the
+    language's shards, sensitive number patterns, OTP/PIN context and urgency words.
+    """
+    text_lower = text.lower()
+    return {
+        "phrases": match_patterns(text_lower, LANGUAGE_SHARDS[language]),
+        "sensitive": [name for name, pattern in SENSITIVE_REGEX.items() if re.search(pattern, text)],
+        "sensitive_context": any(word in text_lower for word in SENSITIVE_CONTEXT_WORDS),
+        "urgency": [word for word in URGENCY_WORDS if word in text_lower]
+    }
+
+def analyze_text(text: str, acoustics: dict = None, language: str = "auto"):
     """
-    Multimodal analysis: Text + Audio Signal
+    Multimodal analysis: Text + Audio Signal.
+    `language` selects the keyword shards ("auto" detects it from the text).
     """
     if acoustics is None:
         acoustics = {}
+    text = text or ""
+    language = resolve_language(text, language)
         
     # Default Safe
     if not text and not acoustics:
@@ -70,31 +161,36 @@ def analyze_text(text: str, acoustics: dict = None):
             "label": "SAFE",
             "confidence": 0.0,
             "matched_keywords": [],
-            "reason": "No signal detected"
+            "reason": "No signal detected",
+            "language": language
         }
 
-    text_lower = text.lower()
+    return score_signals(scan_text(text, language), acoustics, len(text.split()), language)
+
+def score_signals(signals: dict, acoustics: dict, word_count: int, language: str):
+    """
+    Scores text signals (see scan_text) together with the acoustics.
+    Split from analyze_text so call sessions can score signals gathered segment by segment.
+    """
     score = 0.0
     matched = []
     reasons = []
 
-    # 1. Keyword Analysis
-    for phrase, weight in FRAUD_PATTERNS.items():
-        if phrase in text_lower:
-            score += weight
-            matched.append(phrase)
+    # 1. Keyword Analysis (only the shards of the call's language)
+    for phrase, weight in signals["phrases"]:
+        score += weight
+        matched.append(phrase)
             
     # 2. Regex Analysis (Sensitive Data)
-    for name, pattern in SENSITIVE_REGEX.items():
-        if re.search(pattern, text):
-            # Context check: strict numbers might be phone numbers, but if combined with keywords...
-            if "otp" in text_lower or "code" in text_lower or "pin" in text_lower:
-                score += 0.3
-                matched.append(f"RegEx:{name}")
-                reasons.append("Sensitive data pattern (OTP/PIN) detected")
+    for name in signals["sensitive"]:
+        # Context check: strict numbers might be phone numbers, but if combined with keywords...
+        if signals["sensitive_context"]:
+            score += 0.3
+            matched.append(f"RegEx:{name}")
+            reasons.append("Sensitive data pattern (OTP/PIN) detected")
 
     # 3. Urgency Analysis
-    urgency_hits = sum(1 for word in URGENCY_WORDS if word in text_lower)
+    urgency_hits = len(signals["urgency"])
     if urgency_hits >= 2:
         score += 0.25
         matched.append("urgency-language")
@@ -110,7 +206,7 @@ def analyze_text(text: str, acoustics: dict = None):
     
     # Silence Ratio: Very low silence (< 5%) means rapid fire speech (pressure tactic)
     silence_ratio = acoustics.get("silence_ratio", 0.5)
-    if silence_ratio < 0.05 and len(text.split()) > 10:
+    if silence_ratio < 0.05 and word_count > 10:
         score += 0.15
         matched.append("rapid-speech")
         reasons.append("Unnatural rapid speech detected")
@@ -143,5 +239,22 @@ def analyze_text(text: str, acoustics: dict = None):
         "confidence": confidence,
         "matched_keywords": matched,
         "reason": main_reason,
-        "acoustics": acoustics
+        "acoustics": acoustics,
+        "language": language
+    }
+
+def known_recording_verdict(match: dict, acoustics: dict, language: str = "auto"):
+    """
+    Verdict for audio matching a known scam recording (see fingerprint.FingerprintIndex).
+    A replayed robocall is fraud whatever its transcript would say, so there is nothing to score.
+    Clients only see the clip's opaque id; its path in the index stays in the server log.
+    """
+    return {
+        "label": "HIGH",
+        "confidence": 1.0,
+        "matched_keywords": [f"fingerprint:{match['clip_id']}"],
+        "reason": f"Detected HIGH Risk: Matches known scam recording {match['clip_id']} "
+                  f"({match['hits']} landmarks, score {match['score']})",
+        "acoustics": acoustics,
+        "language": resolve_language("", language)
     }
@@ -0,0 +1,185 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from fraud_engine.language import DEFAULT_LANGUAGE, MAX_DETECT_CHARS, detect_language, normalize_language
+from fraud_engine.rules import COMPILED_SHARDS, SENSITIVE_REGEX, known_recording_verdict, scan_text, score_signals
+
+logger = logging.getLogger(__name__)
+
+# Idle calls are dropped after SESSION_TTL_SEC; past MAX_SESSIONS the least recently
+# used call is evicted. Each session holds at most ~1 KB of text, so the table stays bounded.
+SESSION_TTL_SEC = 15 * 60
+MAX_SESSIONS = 10000
+
+# Text kept from the previous segments so phrases spanning a segment boundary still match:
+# enough for the longest phrase plus its preceding word boundary
+TAIL_CHARS = max(len(phrase) for shard in COMPILED_SHARDS.values() for phrase, _ in shard) + 16
+
+
+def session_key(api_key: str, call_id: str) -> str:
+    """Call ids are scoped per API key, so clients cannot read or extend each other's calls."""
+    return f"{api_key}:{call_id}"
+
+
+def _tail(text: str) -> str:
+    """The last TAIL_CHARS of `text`, starting on a whole word."""
+    if len(text) <= TAIL_CHARS:
+        return text
+    tail = text[-TAIL_CHARS:]
+    space = tail.find(" ")
+    return tail[space + 1:] if space != -1 else ""
+
+
+class CallSession:
+    """
+    Compact running state of one call. Each segment is scanned once, together
+    with a short tail of the previous text, so work per segment is O(segment).
+    """
+
+    __slots__ = ("detect", "language", "sample", "segments", "duration_sec", "measured_sec", "energy", "silence_sec",
+                 "words", "phrases", "sensitive", "sensitive_context", "urgency", "tail", "known_match", "updated",
+                 "lock")
+
+    def __init__(self, language: str = "auto"):
+        code = normalize_language(language)
+        self.detect = code in (None, "auto")
+        self.language = None if self.detect else code
+        self.sample = ""  # start of the call, for language detection
+        self.segments = 0
+        self.duration_sec = 0.0
+        self.measured_sec = 0.0  # segments with loudness/silence features (not fingerprint matches)
+        self.energy = 0.0  # mean power x seconds, so loudness averages over the whole call
+        self.silence_sec = 0.0
+        self.words = 0
+        self.phrases = {}
+        self.sensitive = set()
+        self.sensitive_context = False
+        self.urgency = set()
+        self.tail = ""
+        self.known_match = None  # first segment matching a known scam recording
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def add_segment(self, text: str, acoustics: dict, known_match: dict = None):
+        self.segments += 1
+        text = text or ""
+        if known_match and self.known_match is None:
+            self.known_match = known_match
+
+        duration = acoustics.get("duration_sec", 0)
+        if duration > 0:
+            self.duration_sec += duration
+            if "avg_db" in acoustics:
+                self.measured_sec += duration
+                self.energy += 10 ** (acoustics["avg_db"] / 10) * duration
+                self.silence_sec += acoustics.get("silence_ratio", 0) * duration
+
+        if not text.strip():
+            return
+
+        window = f"{self.tail} {text}" if self.tail else text
+        if self.detect and len(self.sample) < MAX_DETECT_CHARS:
+            # Like analyze_text, detect from the first MAX_DETECT_CHARS of the call. Until the
+            # sample is full it is the whole call, so a changed guess can rescan all of it.
+            full = f"{self.sample} {text}" if self.sample else text
+            self.sample = full[:MAX_DETECT_CHARS]
+            language = detect_language(self.sample)
+            if language != self.language:
+                self.language = language
+                self.phrases = {}
+                self.sensitive = set()
+                self.sensitive_context = False
+                self.urgency = set()
+                window = full
+
+        signals = scan_text(window, self.language)
+        for phrase, weight in signals["phrases"]:
+            self.phrases.setdefault(phrase, weight)
+        self.sensitive.update(signals["sensitive"])
+        self.sensitive_context = self.sensitive_context or signals["sensitive_context"]
+        self.urgency.update(signals["urgency"])
+        self.words += len(text.split())
+        self.tail = _tail(window)
+
+    def acoustics(self) -> dict:
+        if self.duration_sec <= 0:
+            return {}
+        if self.measured_sec <= 0:
+            return {"duration_sec": round(self.duration_sec, 1)}
+        avg_db = 10 * math.log10(self.energy / self.measured_sec) if self.energy > 0 else -100
+        return {
+            "avg_db": round(avg_db, 2),
+            "silence_ratio": round(self.silence_sec / self.measured_sec, 2),
+            "duration_sec": round(self.duration_sec, 1)
+        }
+
+    def verdict(self) -> dict:
+        """The call's rule-engine result, as analyze_text would give for the whole call."""
+        language = self.language or DEFAULT_LANGUAGE
+        acoustics = self.acoustics()
+        if self.known_match is not None:
+            return known_recording_verdict(self.known_match, acoustics, language)
+        if not self.words and not acoustics:
+            return {
+                "label": "SAFE",
+                "confidence": 0.0,
+                "matched_keywords": [],
+                "reason": "No signal detected",
+                "acoustics": acoustics,
+                "language": language
+            }
+        signals = {
+            "phrases": list(self.phrases.items()),
+            "sensitive": [name for name in SENSITIVE_REGEX if name in self.sensitive],
+            "sensitive_context": self.sensitive_context,
+            "urgency": list(self.urgency)
+        }
+        return score_signals(signals, acoustics, self.words, language)
+
+
+class SessionStore:
+    """Call sessions in least-recently-used order, with TTL and size-based eviction."""
+
+    def __init__(self, ttl: float = SESSION_TTL_SEC, max_sessions: int = MAX_SESSIONS):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict_expired(self, now: float):
+        while self._sessions:
+            key, session = next(iter(self._sessions.items()))
+            if now - session.updated <= self.ttl:
+                break
+            del self._sessions[key]
+
+    def get_or_create(self, key: str, language: str = "auto") -> CallSession:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            session = self._sessions.get(key)
+            if session is None:
+                if len(self._sessions) >= self.max_sessions:
+                    evicted, _ = self._sessions.popitem(last=False)
+                    logger.warning(f"Session table full, evicted call {evicted.split(':', 1)[-1]}")
+                session = self._sessions[key] = CallSession(language)
+            else:
+                self._sessions.move_to_end(key)
+            session.updated = now
+            return session
+
+    def pop(self, key: str):
+        """Removes and returns a call's session, or None if it is unknown or expired."""
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            return self._sessions.pop(key, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+
+call_sessions = SessionStore()
@@ -0,0 +1,327 @@
+import io
+import json
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_ZstdError = zstandard.ZstdError if zstandard is not None else zlib.error
+
+# Decompressed request bodies are capped, so a small gzip/zstd bomb cannot exhaust memory
+MAX_DECOMPRESSED_BYTES = 200 * 1024 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+# zstd input is fed in slices this small: decompressobj() has no output limit and zstd
+# expands up to ~32000x, so one slice inflates to at most ~16 MB before the limit is checked
+ZSTD_INPUT_BYTES = 512
+
+# Responses smaller than this are sent as-is; compressing them costs more than it saves
+MIN_COMPRESS_BYTES = 512
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+# Binary uploads: Content-Type -> audio_format
+AUDIO_CONTENT_TYPES = {
+    "audio/wav": "wav", "audio/x-wav": "wav", "audio/wave": "wav",
+    "audio/flac": "flac", "audio/x-flac": "flac",
+    "audio/opus": "opus", "audio/ogg": "ogg", "audio/webm": "webm",
+    "audio/mpeg": "mp3", "audio/mp4": "m4a", "audio/aac": "m4a",
+    "audio/l16": "pcm", "audio/pcm": "pcm"
+}
+
+
+class TransportError(ValueError):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class _LimitedSink:
+    """Collects decompressed output, failing as soon as it exceeds `limit`."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.size = 0
+        self._pieces = []
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        if self.size > self.limit:
+            raise TransportError(f"Decompressed body exceeds {self.limit} bytes", 413)
+        self._pieces.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._pieces)
+        self._pieces = []
+        return data
+
+
+class StreamDecompressor:
+    """
+    Incremental Content-Encoding decoder: feed() the compressed body chunk by
+    chunk as it arrives, then finish(). Output is produced in bounded pieces,
+    so the size limit is enforced before a bomb is ever fully inflated.
+    """
+
+    def __init__(self, encoding: str, limit: int = MAX_DECOMPRESSED_BYTES):
+        encoding = encoding.strip().lower()
+        self._sink = _LimitedSink(limit)
+        self._zlib = None
+        self._zstd = None
+        if encoding in ("gzip", "x-gzip"):
+            self._zlib = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            self._zlib = zlib.decompressobj()
+        elif encoding == "zstd" and zstandard is not None:
+            self._zstd = self._zstd_frame()
+        else:
+            raise TransportError(f"Unsupported Content-Encoding: {encoding}", 415)
+
+    def feed(self, chunk: bytes) -> bytes:
+        try:
+            if self._zlib is not None:
+                data = chunk
+                while data:
+                    self._sink.write(self._zlib.decompress(data, READ_CHUNK_BYTES))
+                    data = self._zlib.unconsumed_tail
+            else:
+                for start in range(0, len(chunk), ZSTD_INPUT_BYTES):
+                    data = chunk[start:start + ZSTD_INPUT_BYTES]
+                    while data:
+                        if self._zstd.eof:
+                            # Concatenated frames
+                            self._zstd = self._zstd_frame()
+                        self._sink.write(self._zstd.decompress(data))
+                        data = self._zstd.unused_data if self._zstd.eof else b""
+        except (zlib.error, _ZstdError) as e:
+            raise TransportError(f"Invalid compressed body: {e}") from e
+        return self._sink.take()
+
+    def finish(self) -> bytes:
+        decoder = self._zlib if self._zlib is not None else self._zstd
+        if not decoder.eof:
+            raise TransportError("Truncated compressed body")
+        return self._sink.take()
+
+    @staticmethod
+    def _zstd_frame():
+        return zstandard.ZstdDecompressor().decompressobj(write_size=READ_CHUNK_BYTES)
+
+
+def decompress_body(chunks, encoding: str, limit: int = MAX_DECOMPRESSED_BYTES) -> bytes:
+    decompressor = StreamDecompressor(encoding, limit)
+    pieces = [decompressor.feed(chunk) for chunk in chunks]
+    pieces.append(decompressor.finish())
+    return b"".join(pieces)
+
+
+def choose_encoding(accept_encoding: str):
+    """Best response encoding the client accepts (zstd, then gzip), or None."""
+    accepted = {}
+    for item in (accept_encoding or "").lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name] = quality
+    for encoding in ("zstd", "gzip"):
+        if encoding == "zstd" and zstandard is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _should_compress(content_type: str, content_encoding: str, size: int) -> bool:
+    return (not content_encoding and size >= MIN_COMPRESS_BYTES
+            and (content_type or "").lower().startswith(COMPRESSIBLE_TYPES))
+
+
+def audio_format_from_content_type(content_type: str):
+    """audio_format for a binary upload, e.g. 'audio/ogg; codecs=opus' -> 'opus'."""
+    media_type, _, params = (content_type or "").lower().partition(";")
+    if "opus" in params:
+        return "opus"
+    return AUDIO_CONTENT_TYPES.get(media_type.strip())
+
+
+class WSGITransport:
+    """
+    WSGI middleware: inflates gzip/zstd request bodies before the app sees them
+    and compresses JSON responses when the client sends Accept-Encoding.
+    """
+
+    def __init__(self, app, limit: int = MAX_DECOMPRESSED_BYTES):
+        self.app = app
+        self.limit = limit
+
+    @staticmethod
+    def _read_input(environ):
+        stream = environ["wsgi.input"]
+        remaining = int(environ.get("CONTENT_LENGTH") or 0)
+        terminated = environ.get("wsgi.input_terminated", False)
+        while terminated or remaining > 0:
+            chunk = stream.read(READ_CHUNK_BYTES if terminated else min(READ_CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    def __call__(self, environ, start_response):
+        encoding = environ.get("HTTP_CONTENT_ENCODING", "").strip().lower()
+        if encoding and encoding != "identity":
+            try:
+                body = decompress_body(self._read_input(environ), encoding, self.limit)
+            except TransportError as e:
+                return _wsgi_error(start_response, e)
+            environ["wsgi.input"] = io.BytesIO(body)
+            environ["CONTENT_LENGTH"] = str(len(body))
+            environ.pop("HTTP_CONTENT_ENCODING")
+            environ.pop("wsgi.input_terminated", None)
+
+        response_encoding = choose_encoding(environ.get("HTTP_ACCEPT_ENCODING"))
+        if response_encoding is None:
+            return self.app(environ, start_response)
+
+        captured = {}
+
+        def capture(status, headers, exc_info=None):
+            captured["status"], captured["headers"] = status, headers
+            return lambda data: captured.setdefault("written", []).append(data)
+
+        result = self.app(environ, capture)
+        try:
+            body = b"".join(captured.get("written", [])) + b"".join(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+
+        headers = captured["headers"]
+        names = {name.lower(): value for name, value in headers}
+        if _should_compress(names.get("content-type"), names.get("content-encoding"), len(body)):
+            body = compress(body, response_encoding)
+            headers = [(name, value) for name, value in headers if name.lower() != "content-length"]
+            headers += [("Content-Encoding", response_encoding), ("Content-Length", str(len(body))),
+                        ("Vary", "Accept-Encoding")]
+        start_response(captured["status"], headers)
+        return [body]
+
+
+def _wsgi_error(start_response, error: TransportError):
+    body = json.dumps({"error": str(error)}).encode()
+    reason = {400: "Bad Request", 413: "Payload Too Large", 415: "Unsupported Media Type"}[error.status_code]
+    start_response(f"{error.status_code} {reason}",
+                   [("Content-Type", "application/json"), ("Content-Length", str(len(body)))])
+    return [body]
+
+
+class ASGITransport:
+    """ASGI counterpart of WSGITransport, added with app.add_middleware()."""
+
+    def __init__(self, app, limit: int = MAX_DECOMPRESSED_BYTES):
+        self.app = app
+        self.limit = limit
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {name.lower(): value.decode("latin-1") for name, value in scope["headers"]}
+        encoding = headers.get(b"content-encoding", "").strip().lower()
+        if encoding and encoding != "identity":
+            try:
+                body = await self._inflate(receive, encoding)
+            except TransportError as e:
+                await _asgi_error(send, e)
+                return
+            scope = dict(scope, headers=[
+                (name, value) for name, value in scope["headers"]
+                if name.lower() not in (b"content-encoding", b"content-length")
+            ] + [(b"content-length", str(len(body)).encode())])
+            receive = _replay(body, receive)
+
+        response_encoding = choose_encoding(headers.get(b"accept-encoding"))
+        if response_encoding is not None:
+            send = _CompressingSend(send, response_encoding)
+        await self.app(scope, receive, send)
+
+    async def _inflate(self, receive, encoding: str) -> bytes:
+        decompressor = StreamDecompressor(encoding, self.limit)
+        pieces = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                raise TransportError("Client disconnected")
+            pieces.append(decompressor.feed(message.get("body", b"")))
+            if not message.get("more_body", False):
+                break
+        pieces.append(decompressor.finish())
+        return b"".join(pieces)
+
+
+def _replay(body: bytes, receive):
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+    return replay
+
+
+class _CompressingSend:
+    """Buffers a single-message response body and compresses it if worthwhile."""
+
+    def __init__(self, send, encoding: str):
+        self.send = send
+        self.encoding = encoding
+        self.start = None
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.start is None:
+            await self.send(message)
+            return
+
+        start, self.start = self.start, None
+        body = message.get("body", b"")
+        headers = {name.lower(): value.decode("latin-1") for name, value in start["headers"]}
+        if not message.get("more_body", False) and _should_compress(
+                headers.get(b"content-type"), headers.get(b"content-encoding"), len(body)):
+            body = compress(body, self.encoding)
+            start = dict(start, headers=[
+                (name, value) for name, value in start["headers"] if name.lower() != b"content-length"
+            ] + [(b"content-encoding", self.encoding.encode()), (b"content-length", str(len(body)).encode()),
+                 (b"vary", b"Accept-Encoding")])
+            message = dict(message, body=body)
+        await self.send(start)
+        await self.send(message)
+
+
+async def _asgi_error(send, error: TransportError):
+    body = json.dumps({"detail": str(error)}).encode()
+    await send({"type": "http.response.start", "status": error.status_code, "headers": [
+        (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})